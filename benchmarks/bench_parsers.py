@@ -0,0 +1,92 @@
+"""Сравнение скорости извлечения данных парсерами bs4 и lxml.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_parsers.py [-n 50]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+PEP_CARD = '''<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8">
+<title>PEP 8 – Style Guide for Python Code | peps.python.org</title></head>
+<body><section id="pep-page-section"><article>
+<section id="pep-content">
+<h1 class="page-title">PEP 8 – Style Guide for Python Code</h1>
+<dl class="rfc2822 field-list simple">
+<dt class="field-odd">Author<span class="colon">:</span></dt>
+<dd class="field-odd">Guido van Rossum, Barry Warsaw, Alyssa Coghlan</dd>
+<dt class="field-even">Status<span class="colon">:</span></dt>
+<dd class="field-even"><abbr title="Currently valid">Active</abbr></dd>
+<dt class="field-odd">Type<span class="colon">:</span></dt>
+<dd class="field-odd"><abbr title="Non-normative">Process</abbr></dd>
+<dt class="field-even">Created<span class="colon">:</span></dt>
+<dd class="field-even">05-Jul-2001</dd>
+</dl>
+{sections}
+</section></article></section></body></html>
+'''
+
+SECTION = '''<section id="section-{number}">
+<h2>Section {number}</h2>
+<p>Code is read much more often than it is written. The guidelines
+provided here are intended to improve the readability of code and make it
+consistent across the wide spectrum of <a href="#x">Python code</a>.</p>
+<ul><li><p>Item one</p></li><li><p>Item <code>two</code></p></li></ul>
+<pre>def long_function_name(
+        var_one, var_two, var_three,
+        var_four):
+    print(var_one)</pre>
+</section>
+'''
+
+WHATS_NEW_PAGE = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head><body><div class="body">
+<section id="what-s-new-in-python-3-11">
+<h1>What’s New In Python 3.11</h1>
+<dl class="field-list simple">
+<dt class="field-odd">Editor<span class="colon">:</span></dt>
+<dd class="field-odd"><p>Pablo Galindo Salgado</p></dd>
+</dl>
+{sections}
+</section></div></body></html>
+'''
+
+
+def bench(number):
+    sys.path.append(str(SRC_DIR))
+    from main import (get_pep_status, get_pep_status_lxml, get_version_info,
+                      get_version_info_lxml)
+    from utils import make_soup, make_tree
+    cases = {
+        'pep': (PEP_CARD, get_pep_status, get_pep_status_lxml),
+        'whats-new': (
+            WHATS_NEW_PAGE, get_version_info, get_version_info_lxml
+        ),
+    }
+    print(f'{"Страница":<12}{"bs4, мс":>10}{"lxml, мс":>10}{"Ускорение":>12}')
+    for name, (template, extract_bs4, extract_lxml) in cases.items():
+        page = template.format(sections=''.join(
+            SECTION.format(number=index) for index in range(40)
+        )).encode('utf-8')
+        assert extract_bs4(make_soup(page)) == extract_lxml(make_tree(page))
+        timings = [
+            min(timeit.repeat(
+                lambda: extract(parse(page)), number=number, repeat=3
+            )) / number * 1000
+            for parse, extract in (
+                (make_soup, extract_bs4), (make_tree, extract_lxml)
+            )
+        ]
+        print(
+            f'{name:<12}{timings[0]:>10.2f}{timings[1]:>10.2f}'
+            f'{timings[0] / timings[1]:>11.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--number', type=int, default=50)
+    bench(parser.parse_args().number)
@@ -0,0 +1,115 @@
+"""Сравнение транспортов сессии на локальном HTTP сервере.
+
+Сервер добавляет задержку при установке соединения (как рукопожатие
+TLS по сети) и при ответе на запрос. Для каждого транспорта выводятся
+время загрузки страниц, запросов в секунду и количество открытых
+соединений.
+
+Запуск из корня репозитория:
+    python benchmarks/bench_transport.py [-n 400] [-w 32]
+"""
+import argparse
+import sys
+import threading
+import time
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib.util import find_spec
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+
+PAGE = ('<html><body>' + '<p>PEP</p>' * 2000 + '</body></html>').encode()
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        with self.server.lock:
+            self.server.connections += 1
+        time.sleep(self.server.connect_delay)
+        super().setup()
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+class PageServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, connect_delay, latency):
+        super().__init__(('127.0.0.1', 0), PageHandler)
+        self.connect_delay = connect_delay
+        self.latency = latency
+        self.connections = 0
+        self.lock = threading.Lock()
+
+
+def fetch_all(adapter, urls, workers):
+    session = requests.Session()
+    session.mount('http://', adapter)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for response in executor.map(session.get, urls):
+            assert response.content == PAGE
+    session.close()
+
+
+def transports(workers):
+    sys.path.append(str(SRC_DIR))
+    from configs import configure_adapter
+    cli_args = dict(workers=workers, rate=10 ** 6, retries=0)
+    yield 'requests HTTPAdapter', HTTPAdapter()
+    yield 'pool = workers', configure_adapter(Namespace(**cli_args))
+    if find_spec('httpx') and find_spec('h2'):
+        yield 'httpx (--http2)', configure_adapter(
+            Namespace(http2=True, **cli_args)
+        )
+
+
+def bench(number, workers, connect_delay, latency):
+    server = PageServer(connect_delay / 1000, latency / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [
+        f'http://127.0.0.1:{server.server_port}/pep-{index:04}/'
+        for index in range(number)
+    ]
+    print(f'{"Транспорт":<24}{"Время, с":>10}{"Запросов/с":>12}'
+          f'{"Соединений":>12}')
+    for name, adapter in transports(workers):
+        server.connections = 0
+        started = time.perf_counter()
+        fetch_all(adapter, urls, workers)
+        elapsed = time.perf_counter() - started
+        print(f'{name:<24}{elapsed:>10.2f}{number / elapsed:>12.0f}'
+              f'{server.connections:>12}')
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--number', type=int, default=400)
+    parser.add_argument('-w', '--workers', type=int, default=32)
+    parser.add_argument(
+        '--connect-delay', type=float, default=30,
+        help='Задержка установки соединения, мс'
+    )
+    parser.add_argument(
+        '--latency', type=float, default=5, help='Задержка ответа, мс'
+    )
+    args = parser.parse_args()
+    bench(args.number, args.workers, args.connect_delay, args.latency)
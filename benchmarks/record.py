@@ -0,0 +1,67 @@
+"""Запись страниц документации Python и PEP для бенчмарков.
+
+Запуск из корня репозитория:
+    python benchmarks/record.py [--peps 50]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from urllib.parse import urljoin
+
+import requests
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+
+def record(session, manifest, sites, site, path):
+    """Сохраняет страницу сайта и добавляет ее в манифест."""
+    url = urljoin(sites[site], path)
+    response = session.get(url)
+    response.raise_for_status()
+    file_name = f'{site}/{path.strip("/").replace("/", "__") or "index"}.html'
+    (FIXTURES_DIR / file_name).write_bytes(response.content)
+    manifest[f'{site}/{path}'] = file_name
+    return url
+
+
+def main(peps_sample):
+    sys.path.append(str(SRC_DIR))
+    from constants import MAIN_DOC_URL, PEPS_URL
+    from utils import find_tag, find_tag_all, get_soup_by_url, select_tag_all
+    sites = {'docs': MAIN_DOC_URL, 'peps': PEPS_URL}
+    for site in sites:
+        (FIXTURES_DIR / site).mkdir(parents=True, exist_ok=True)
+    session = requests.Session()
+    manifest = {}
+    record(session, manifest, sites, 'docs', '')
+    record(session, manifest, sites, 'docs', 'whatsnew/')
+    whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
+    soup = get_soup_by_url(session, whats_new_url)
+    main_div = find_tag(soup, 'section', attrs={'id': 'what-s-new-in-python'})
+    div_with_ul = find_tag(main_div, 'div', attrs={'class': 'toctree-wrapper'})
+    for section in find_tag_all(
+        div_with_ul, 'li', attrs={'class': 'toctree-l1'}
+    ):
+        url = urljoin(whats_new_url, find_tag(section, 'a', href=True)['href'])
+        record(session, manifest, sites, 'docs', url[len(MAIN_DOC_URL):])
+    record(session, manifest, sites, 'peps', '')
+    peps_records = select_tag_all(
+        get_soup_by_url(session, PEPS_URL),
+        '#numerical-index tbody > tr > td:nth-child(2) > a[href]'
+    )
+    step = max(len(peps_records) // peps_sample, 1)
+    for a_tag in peps_records[::step][:peps_sample]:
+        record(session, manifest, sites, 'peps', a_tag['href'])
+    with open(FIXTURES_DIR / 'manifest.json', 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    print(f'Записано страниц: {len(manifest)} в {FIXTURES_DIR}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--peps', type=int, default=50, help='Количество карточек PEP'
+    )
+    main(parser.parse_args().peps)
@@ -0,0 +1,278 @@
+"""Бенчмарк режимов парсера и способов вывода на записанных страницах.
+
+По умолчанию страницы генерируются synthetic.py и результаты
+сравниваются с базовой линией benchmarks/baseline.json, с параметром
+--recorded отдаются записанные страницы из benchmarks/fixtures
+(см. record.py). Страницы отдаются локальным HTTP сервером. Каждый
+случай запускается в отдельном процессе, чтобы пиковое потребление
+памяти не зависело от остальных случаев.
+
+Запуск из корня репозитория:
+    python benchmarks/run.py [--recorded] [--save baseline.json]
+                             [--compare baseline.json]
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from argparse import Namespace
+from contextlib import redirect_stderr, redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCHMARKS_DIR.parent / 'src'
+FIXTURES_DIR = BENCHMARKS_DIR / 'fixtures'
+BASELINE_FILE = BENCHMARKS_DIR / 'baseline.json'
+
+MODES = ('whats-new', 'latest-versions', 'pep')
+BACKENDS = (
+    ('sync', 'bs4'),
+    ('sync', 'lxml'),
+    ('async', 'bs4'),
+    ('async', 'lxml'),
+    ('process', 'bs4'),
+)
+OUTPUTS = ('console', 'pretty', 'file')
+OUTPUT_ROWS = 20000
+WARM_RUNS = 3
+MIN_COMPARED_TIME = 0.2
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Отдает записанные страницы, карточки PEP без записи - по кругу."""
+
+    def do_GET(self):
+        path = self.path.lstrip('/')
+        file_name = self.server.manifest.get(path)
+        if file_name is None and path.startswith('peps/pep-'):
+            number = int(''.join(filter(str.isdigit, path)) or 0)
+            file_name = self.server.pep_cards[
+                number % len(self.server.pep_cards)
+            ]
+        if file_name is None:
+            self.send_error(404)
+            return
+        body = (self.server.fixtures_dir / file_name).read_bytes()
+        with self.server.lock:
+            self.server.requests_count += 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def start_server(fixtures_dir):
+    with open(fixtures_dir / 'manifest.json', encoding='utf-8') as file:
+        manifest = json.load(file)
+    server = FixtureServer(('127.0.0.1', 0), FixtureHandler)
+    server.fixtures_dir = fixtures_dir
+    server.manifest = manifest
+    server.pep_cards = sorted(
+        file_name for path, file_name in manifest.items()
+        if path.startswith('peps/pep-')
+    )
+    server.requests_count = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def peak_rss_mb():
+    """Пиковая память процесса в МБ, ru_maxrss в macOS в байтах."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+
+
+def run_mode(base_url, mode, engine, parser, workers, queue):
+    """Холодный и лучший из WARM_RUNS теплых запусков с кешем в памяти."""
+    sys.path.insert(0, str(SRC_DIR))
+    logging.disable(logging.ERROR)
+    import main
+    import requests_cache
+    main.MAIN_DOC_URL = f'{base_url}docs/'
+    main.PEPS_URL = f'{base_url}peps/'
+    cli_args = Namespace(
+        mode=mode, engine=engine, parser=parser, workers=workers
+    )
+    session = requests_cache.CachedSession(backend='memory')
+    with open(os.devnull, 'w') as devnull, \
+            redirect_stdout(devnull), redirect_stderr(devnull):
+        timings = []
+        for _ in range(WARM_RUNS + 1):
+            started = time.perf_counter()
+            main.collect_results(session, cli_args)
+            timings.append(time.perf_counter() - started)
+            if len(timings) == 1:
+                queue.put(('cold', timings[0]))
+    queue.put(('warm', min(timings[1:])))
+    queue.put(('rss', peak_rss_mb()))
+    if engine == 'process':
+        # Процесс случая при выходе ждет рабочие процессы пула разбора
+        import utils
+        utils.process_pool().shutdown()
+
+
+def run_output(output, queue):
+    """Вывод таблицы из OUTPUT_ROWS строк."""
+    sys.path.insert(0, str(SRC_DIR))
+    logging.disable(logging.ERROR)
+    import outputs
+    results = [('Ссылка', 'Заголовок', 'Автор')] + [
+        (f'https://peps.python.org/pep-{number:04d}/', f'PEP {number}', 'A')
+        for number in range(OUTPUT_ROWS)
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        outputs.BASE_DIR = Path(tmp_dir)
+        timings = []
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            for _ in range(WARM_RUNS):
+                started = time.perf_counter()
+                outputs.control_output(
+                    results, Namespace(mode='bench', output=output)
+                )
+                timings.append(time.perf_counter() - started)
+    queue.put(('cold', timings[0]))
+    queue.put(('warm', min(timings)))
+    queue.put(('rss', peak_rss_mb()))
+
+
+def run_case(target, *args, count_items=None):
+    """Запускает случай в отдельном процессе.
+
+    count_items вызывается после холодного запуска и возвращает
+    количество обработанных элементов.
+    """
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=target, args=(*args, queue))
+    process.start()
+    result = {}
+    for _ in range(3):
+        name, value = queue.get()
+        result[name] = value
+        if name == 'cold' and count_items is not None:
+            result['items'] = count_items()
+    process.join()
+    return result
+
+
+def bench(workers, fixtures_dir):
+    server = start_server(fixtures_dir)
+    base_url = f'http://127.0.0.1:{server.server_port}/'
+    results = {}
+    for mode in MODES:
+        backends = BACKENDS if mode != 'latest-versions' else BACKENDS[:1]
+        for engine, parser in backends:
+            server.requests_count = 0
+            results[f'{mode}/{engine}/{parser}'] = run_case(
+                run_mode,
+                base_url,
+                mode,
+                engine,
+                parser,
+                workers,
+                count_items=lambda: server.requests_count
+            )
+    for output in OUTPUTS:
+        results[f'output/{output}'] = run_case(
+            run_output, output, count_items=lambda: OUTPUT_ROWS
+        )
+    server.shutdown()
+    for result in results.values():
+        result['throughput'] = result['items'] / result['warm']
+    return results
+
+
+def report(results, baseline=None, tolerance=0.0):
+    """Печатает таблицу результатов, возвращает список регрессий.
+
+    Случаи быстрее MIN_COMPARED_TIME секунд в базовой линии слишком
+    шумные и в проверку регрессий не входят.
+    """
+    print(
+        f'{"Случай":<26}{"Элементов":>10}{"Холодный, с":>13}'
+        f'{"Теплый, с":>11}{"Элем./с":>10}{"RSS, МБ":>9}{"База":>8}'
+    )
+    regressions = []
+    for case, result in results.items():
+        change = ''
+        if baseline and case in baseline:
+            ratio = result['throughput'] / baseline[case]['throughput']
+            change = f'{ratio - 1:+.0%}'
+            if (
+                ratio < 1 - tolerance
+                and baseline[case]['warm'] >= MIN_COMPARED_TIME
+            ):
+                regressions.append(case)
+        print(
+            f'{case:<26}{result["items"]:>10}{result["cold"]:>13.3f}'
+            f'{result["warm"]:>11.3f}{result["throughput"]:>10.0f}'
+            f'{result["rss"]:>9.0f}{change:>8}'
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-w', '--workers', type=int, default=8)
+    parser.add_argument(
+        '--recorded',
+        action='store_true',
+        help='Записанные страницы вместо сгенерированных'
+    )
+    parser.add_argument('--save', type=Path, help='Сохранить базовую линию')
+    parser.add_argument(
+        '--compare',
+        type=Path,
+        help=f'Сравнить с базовой, по умолчанию {BASELINE_FILE.name} '
+             'для сгенерированных страниц'
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.2,
+        help='Допустимое падение пропускной способности, доля'
+    )
+    args = parser.parse_args()
+    if args.recorded:
+        if not (FIXTURES_DIR / 'manifest.json').exists():
+            sys.exit('Нет записанных страниц, запустите benchmarks/record.py')
+        results = bench(args.workers, FIXTURES_DIR)
+    else:
+        from synthetic import generate
+        with tempfile.TemporaryDirectory() as fixtures_dir:
+            generate(Path(fixtures_dir))
+            results = bench(args.workers, Path(fixtures_dir))
+    compare = args.compare
+    if compare is None and not args.recorded and BASELINE_FILE.exists():
+        compare = BASELINE_FILE
+    baseline = None
+    if compare:
+        with open(compare, encoding='utf-8') as file:
+            baseline = json.load(file)
+    regressions = report(results, baseline, args.tolerance)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+    if regressions:
+        sys.exit(f'Падение пропускной способности: {", ".join(regressions)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""Детерминированные страницы документации Python и PEP для бенчмарков.
+
+Страницы повторяют разметку сайтов в объеме, который разбирают режимы
+парсера, и записываются в том же формате, что и record.py. Одинаковые
+параметры всегда дают одинаковые страницы, поэтому с ними сравнивается
+базовая линия benchmarks/baseline.json.
+
+Запуск из корня репозитория:
+    python benchmarks/synthetic.py [--peps 400] [--versions 13]
+"""
+import argparse
+import json
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+PEPS = 400
+VERSIONS = 13
+SECTIONS = 20
+
+PEP_STATUSES = (
+    ('A', 'Active'), ('A', 'Accepted'), ('D', 'Deferred'), ('F', 'Final'),
+    ('P', 'Provisional'), ('R', 'Rejected'), ('S', 'Superseded'),
+    ('W', 'Withdrawn'), ('', 'Draft'),
+)
+
+DOCS_INDEX = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head><body>
+<div class="sphinxsidebar"><div class="sphinxsidebarwrapper">
+<h3>Download</h3>
+<ul><li><a href="download.html">Download these documents</a></li></ul>
+<h3>Docs by version</h3>
+<ul>
+{versions}
+<li><a href="https://www.python.org/doc/versions/">All versions</a></li>
+</ul>
+</div></div></body></html>
+'''
+
+DOCS_VERSION = (
+    '<li><a href="https://docs.python.org/3.{minor}/">'
+    'Python 3.{minor} ({status})</a></li>'
+)
+
+WHATS_NEW_INDEX = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head><body><div class="body">
+<section id="what-s-new-in-python">
+<h1>What’s New in Python</h1>
+<div class="toctree-wrapper compound">
+<ul>
+{versions}
+</ul>
+</div></section></div></body></html>
+'''
+
+WHATS_NEW_ITEM = (
+    '<li class="toctree-l1">'
+    '<a class="reference internal" href="3.{minor}.html">'
+    'What’s New In Python 3.{minor}</a></li>'
+)
+
+WHATS_NEW_PAGE = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head><body><div class="body">
+<section id="what-s-new-in-python-3-{minor}">
+<h1>What’s New In Python 3.{minor}</h1>
+<dl class="field-list simple">
+<dt class="field-odd">Editor<span class="colon">:</span></dt>
+<dd class="field-odd"><p>Editor {minor}</p></dd>
+</dl>
+{sections}
+</section></div></body></html>
+'''
+
+PEP_INDEX = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"></head><body>
+<section id="numerical-index"><h2>Numerical Index</h2>
+<table class="pep-zero-table docutils align-default">
+<thead><tr><th>&#160;</th><th>PEP</th><th>Title</th></tr></thead>
+<tbody>
+{rows}
+</tbody></table></section></body></html>
+'''
+
+PEP_ROW = (
+    '<tr class="row-odd">\n'
+    '<td><abbr title="{status}">S{key}</abbr></td>\n'
+    '<td><a class="pep reference internal" href="pep-{number:04d}/">'
+    '{number}</a></td>\n'
+    '<td><a class="pep reference internal" href="pep-{number:04d}/">'
+    'PEP {number}</a></td>\n'
+    '</tr>'
+)
+
+PEP_CARD = '''<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"></head>
+<body><section id="pep-page-section"><article>
+<section id="pep-content">
+<h1 class="page-title">PEP {number} – Synthetic PEP</h1>
+<dl class="rfc2822 field-list simple">
+<dt class="field-odd">Author<span class="colon">:</span></dt>
+<dd class="field-odd">Author {number}</dd>
+<dt class="field-even">Status<span class="colon">:</span></dt>
+<dd class="field-even"><abbr title="{status}">{status}</abbr></dd>
+<dt class="field-odd">Type<span class="colon">:</span></dt>
+<dd class="field-odd"><abbr title="Normative">Standards Track</abbr></dd>
+<dt class="field-even">Created<span class="colon">:</span></dt>
+<dd class="field-even">05-Jul-2001</dd>
+</dl>
+{sections}
+</section></article></section></body></html>
+'''
+
+SECTION = '''<section id="section-{number}">
+<h2>Section {number}</h2>
+<p>Code is read much more often than it is written. The guidelines
+provided here are intended to improve the readability of code and make it
+consistent across the wide spectrum of <a href="#x">Python code</a>.</p>
+<ul><li><p>Item one</p></li><li><p>Item <code>two</code></p></li></ul>
+<pre>def long_function_name(
+        var_one, var_two, var_three,
+        var_four):
+    print(var_one)</pre>
+</section>
+'''
+
+
+def sections(number):
+    return ''.join(SECTION.format(number=index) for index in range(number))
+
+
+def pages(peps=PEPS, versions=VERSIONS):
+    """Возвращает пары (путь в манифесте, разметка страницы)."""
+    minors = range(versions - 1, -1, -1)
+    yield 'docs/', DOCS_INDEX.format(versions='\n'.join(
+        DOCS_VERSION.format(
+            minor=minor, status='in development' if minor == minors[0]
+            else 'stable'
+        )
+        for minor in minors
+    ))
+    yield 'docs/whatsnew/', WHATS_NEW_INDEX.format(versions='\n'.join(
+        WHATS_NEW_ITEM.format(minor=minor) for minor in minors
+    ))
+    for minor in minors:
+        yield f'docs/whatsnew/3.{minor}.html', WHATS_NEW_PAGE.format(
+            minor=minor, sections=sections(SECTIONS)
+        )
+    statuses = [
+        PEP_STATUSES[number % len(PEP_STATUSES)] for number in range(peps)
+    ]
+    yield 'peps/', PEP_INDEX.format(rows='\n'.join(
+        PEP_ROW.format(number=number, key=key, status=status)
+        for number, (key, status) in enumerate(statuses)
+    ))
+    for number, (_, status) in enumerate(statuses):
+        yield f'peps/pep-{number:04d}/', PEP_CARD.format(
+            number=number, status=status, sections=sections(SECTIONS // 2)
+        )
+
+
+def generate(fixtures_dir=FIXTURES_DIR, peps=PEPS, versions=VERSIONS):
+    """Записывает страницы и манифест в fixtures_dir."""
+    manifest = {}
+    for path, page in pages(peps, versions):
+        site, _, page_path = path.partition('/')
+        file_name = (
+            f'{site}/{page_path.strip("/").replace("/", "__") or "index"}'
+            '.html'
+        )
+        (fixtures_dir / site).mkdir(parents=True, exist_ok=True)
+        (fixtures_dir / file_name).write_text(page, encoding='utf-8')
+        manifest[path] = file_name
+    with open(fixtures_dir / 'manifest.json', 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    return manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--peps', type=int, default=PEPS)
+    parser.add_argument('--versions', type=int, default=VERSIONS)
+    args = parser.parse_args()
+    manifest = generate(peps=args.peps, versions=args.versions)
+    print(f'Записано страниц: {len(manifest)} в {FIXTURES_DIR}')
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from http import HTTPStatus
+from time import perf_counter
+
+import aiohttp
+from requests import RequestException
+from requests.exceptions import HTTPError
+
+import timings
+from constants import DEFAULT_PARSER, DEFAULT_WORKERS, RETRY_STATUSES
+from metrics import increment, observe_response
+from throttling import backoff_delay, response_retry_delay
+from utils import extract_page
+
+
+def create_client_session(limit=DEFAULT_WORKERS):
+    """Возвращает клиентскую сессию aiohttp с ограничением соединений."""
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=limit))
+
+
+def client_timeout(timeout):
+    """Переводит таймаут requests (число или пара) в таймаут aiohttp."""
+    connect, read = (
+        timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    )
+    return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+
+
+async def fetch(client, url, adapter=None):
+    """Загружает ресурс и возвращает код и содержимое ответа.
+
+    С транспортом `SchedulingAdapter` запросы к хосту делят с ним
+    ограничение частоты и повторяются по тем же правилам.
+    """
+    if adapter is None:
+        async with client.get(url) as response:
+            return response.status, await response.read()
+    bucket = adapter.get_bucket(url)
+    timeout = client_timeout(adapter.timeout)
+    attempt = 0
+    while True:
+        await bucket.acquire_async()
+        try:
+            async with client.get(url, timeout=timeout) as response:
+                content = await response.read()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as exc:
+            if isinstance(exc, asyncio.TimeoutError):
+                adapter.count('timed_out')
+                increment('request_timeouts_total')
+            if attempt >= adapter.retries:
+                raise
+            reason, delay = type(exc).__name__, backoff_delay(attempt)
+        else:
+            bucket.adjust(response.status)
+            if (
+                response.status not in RETRY_STATUSES
+                or attempt >= adapter.retries
+            ):
+                return response.status, content
+            reason = str(response.status)
+            delay = response_retry_delay(response, attempt)
+        attempt += 1
+        adapter.log_retry(url, attempt, reason, delay)
+        await asyncio.sleep(delay)
+
+
+async def get_response(client, url, adapter=None):
+    """Асинхронная загрузка данных ресурса по url."""
+    started = perf_counter()
+    error_msg = f'Возникла ошибка при загрузке ресурса по адресу: {url}'
+    try:
+        status, content = await fetch(client, url, adapter)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        logging.exception(error_msg, stack_info=True)
+        raise RequestException(error_msg) from exc
+    if status >= HTTPStatus.BAD_REQUEST:
+        error_msg = f'{error_msg}. Код ответа: {status}'
+        logging.error(error_msg, stack_info=True)
+        raise HTTPError(error_msg)
+    elapsed = perf_counter() - started
+    observe_response(elapsed, False)
+    if timings.profiler is not None:
+        timings.profiler.add_response(elapsed, len(content), False)
+    return content
+
+
+async def extract_by_url(
+    client, url, extract, parser=DEFAULT_PARSER, memo=None, adapter=None
+):
+    """Асинхронно загружает страницу по url и извлекает из нее данные."""
+    content = await get_response(client, url, adapter)
+    return extract_page(url, content, extract, parser, memo)
+
+
+def scheduling_adapter(session, url):
+    """Возвращает транспорт сессии с ограничением частоты или None."""
+    if session is None:
+        return None
+    adapter = session.get_adapter(url)
+    return adapter if hasattr(adapter, 'get_bucket') else None
+
+
+def extract_by_urls(
+    urls,
+    extract,
+    limit=DEFAULT_WORKERS,
+    parser=DEFAULT_PARSER,
+    memo=None,
+    session=None
+):
+    """Загружает страницы в одном цикле событий и отдает пары (url, task).
+
+    Ограничение частоты, таймауты и повторы берутся из транспорта
+    сессии requests.
+    """
+    loop = asyncio.new_event_loop()
+    client = loop.run_until_complete(_open_client_session(limit))
+    tasks = {
+        loop.create_task(
+            extract_by_url(
+                client, url, extract, parser, memo,
+                scheduling_adapter(session, url)
+            )
+        ): url
+        for url in urls
+    }
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = loop.run_until_complete(
+                asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            )
+            for task in done:
+                yield tasks[task], task
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(
+                asyncio.gather(*pending, return_exceptions=True)
+            )
+        loop.run_until_complete(client.close())
+        loop.close()
+
+
+async def _open_client_session(limit):
+    return create_client_session(limit)
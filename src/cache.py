@@ -0,0 +1,129 @@
+import logging
+import os
+from pathlib import Path
+from threading import Lock
+
+from throttling import SchedulingAdapter
+
+
+class CacheStats:
+    """Счетчики попаданий и промахов кеша страниц."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def count(self, response):
+        with self.lock:
+            if getattr(response, 'from_cache', False):
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def sqlite_backend(cli_args):
+    """SQLite в режиме WAL, доступный нескольким процессам одновременно."""
+    import requests_cache
+    return requests_cache.SQLiteCache(cli_args.cache_name, wal=True)
+
+
+def filesystem_backend(cli_args):
+    """Ответы хранятся отдельными файлами в директории кеша."""
+    import requests_cache
+    return requests_cache.FileCache(cli_args.cache_name)
+
+
+def redis_backend(cli_args):
+    """Хранилище, совместимое с протоколом Redis."""
+    import requests_cache
+    from redis import Redis
+    return requests_cache.RedisCache(
+        Path(cli_args.cache_name).name,
+        connection=Redis.from_url(cli_args.cache_url)
+    )
+
+
+CACHE_BACKEND_TO_FUNCTION = {
+    'sqlite': sqlite_backend,
+    'filesystem': filesystem_backend,
+    'redis': redis_backend,
+}
+
+
+def create_cache_backend(cli_args):
+    """Возвращает хранилище кеша, выбранное в аргументах командной строки."""
+    return CACHE_BACKEND_TO_FUNCTION[cli_args.cache_backend](cli_args)
+
+
+def stored_size(cache):
+    """Возвращает размер хранилища кеша на диске в байтах.
+
+    Для хранилищ, размер которых нельзя узнать без чтения ответов,
+    возвращает None.
+    """
+    responses = cache.responses
+    if hasattr(responses, 'db_path') and hasattr(responses, 'size'):
+        wal_path = Path(f'{responses.db_path}-wal')
+        return responses.size() + (
+            wal_path.stat().st_size if wal_path.exists() else 0
+        )
+    cache_dir = getattr(responses, 'cache_dir', None)
+    if cache_dir is not None:
+        with os.scandir(cache_dir) as entries:
+            return sum(
+                entry.stat().st_size for entry in entries if entry.is_file()
+            )
+    return None
+
+
+def trim_cache(cache, max_bytes=None):
+    """Удаляет устаревшие ответы и самые старые ответы сверх max_bytes.
+
+    Ответы читаются, только если хранилище больше max_bytes.
+    """
+    cache.delete(expired=True)
+    if max_bytes is None:
+        return
+    cache_size = stored_size(cache)
+    if cache_size is not None and cache_size <= max_bytes:
+        return
+    responses = sorted(
+        cache.responses.values(),
+        key=lambda response: response.created_at,
+        reverse=True
+    )
+    cache_size = 0
+    evicted_keys = []
+    for response in responses:
+        cache_size += response.size
+        if cache_size > max_bytes:
+            evicted_keys.append(response.cache_key)
+    if evicted_keys:
+        cache.delete(*evicted_keys)
+        logging.info(
+            f'Из кеша удалено ответов: {len(evicted_keys)}, '
+            f'ограничение размера: {max_bytes} байт'
+        )
+
+
+def close_session(session, cli_args):
+    """Сжимает кеш, записывает в лог статистику кеша и закрывает сессию."""
+    trim_cache(session.cache, cli_args.cache_max_bytes)
+    stats = session.cache_stats
+    logging.info(
+        f'Статистика кеша: попаданий {stats.hits}, промахов {stats.misses}, '
+        f'доля попаданий {stats.hit_ratio:.0%}'
+    )
+    adapter = session.get_adapter('https://')
+    if isinstance(adapter, SchedulingAdapter):
+        logging.info(
+            f'Повторов запросов: {adapter.retried}, '
+            f'таймаутов: {adapter.timed_out}'
+        )
+    session.close()
@@ -1,14 +1,81 @@
 import argparse
+import atexit
+import datetime as dt
 import logging
 from logging.handlers import RotatingFileHandler
+from pathlib import Path
 
-from constants import DT_FORMAT, LOG_FILE, LOG_FORMAT, LOG_PATH
+from cache import CacheStats, create_cache_backend
+from constants import (CACHE_BACKENDS, CACHE_NAME, DEFAULT_CACHE_BACKEND,
+                       DEFAULT_CACHE_URL, DEFAULT_DOWNLOAD_FORMATS,
+                       DEFAULT_ENGINE, DEFAULT_LOG_FORMAT, DEFAULT_LOG_POLICY,
+                       DEFAULT_PARSER, DEFAULT_POOL_SIZE, DEFAULT_RATE,
+                       DEFAULT_REPORT, DEFAULT_RETRIES, DEFAULT_TIMEOUT,
+                       DEFAULT_WORKERS, DOWNLOAD_FORMATS, DUMP_DIR, ENGINES,
+                       LOG_FILE, LOG_FORMATS, LOG_PATH, LOG_POLICIES,
+                       LOG_QUEUE_SIZE, NEVER_EXPIRE, OUTPUTS, PARSERS,
+                       PEP_INDEX_FIELDS, REPORTS)
+from log_queue import LogPipeline
+from throttling import SchedulingAdapter
+from transport import HTTP2Adapter
+
+
+def positive_int(value):
+    """Проверяет, что аргумент командной строки - целое число больше нуля."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается целое число больше нуля: {value}'
+        )
+    return number
+
+
+def non_negative_int(value):
+    """Проверяет, что аргумент командной строки - целое число от нуля."""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается целое число не меньше нуля: {value}'
+        )
+    return number
+
+
+def positive_float(value):
+    """Проверяет, что аргумент командной строки - число больше нуля."""
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается число больше нуля: {value}'
+        )
+    return number
+
+
+def index_filter(value):
+    """Разбирает условие отбора PEP вида поле=значение."""
+    field, separator, field_value = value.partition('=')
+    if not separator or field not in PEP_INDEX_FIELDS:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается условие вида поле=значение, '
+            f'поля: {", ".join(PEP_INDEX_FIELDS)}: {value}'
+        )
+    return PEP_INDEX_FIELDS[field], field_value
+
+
+def iso_date(value):
+    """Проверяет, что аргумент командной строки - дата в формате ISO 8601."""
+    try:
+        return dt.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'Ожидается дата в формате ГГГГ-ММ-ДД: {value}'
+        )
 
 
 def configure_argument_parser(available_modes):
     parser = argparse.ArgumentParser(description='Парсер документации Python')
     parser.add_argument(
         'mode',
+        nargs='+',
         choices=available_modes,
         help='Режимы работы парсера'
     )
@@ -18,23 +85,260 @@ def configure_argument_parser(available_modes):
         action='store_true',
         help='Очистка кеша'
     )
+    parser.add_argument(
+        '--cache-backend',
+        choices=CACHE_BACKENDS,
+        default=DEFAULT_CACHE_BACKEND,
+        help='Хранилище кеша страниц'
+    )
+    parser.add_argument(
+        '--cache-name',
+        default=CACHE_NAME,
+        help='Путь к кешу или пространство имен redis'
+    )
+    parser.add_argument(
+        '--cache-url',
+        default=DEFAULT_CACHE_URL,
+        help='Адрес хранилища кеша redis'
+    )
+    parser.add_argument(
+        '--cache-max-bytes',
+        type=positive_int,
+        help='Максимальный размер кеша в байтах'
+    )
+    parser.add_argument(
+        '--max-age',
+        type=int,
+        default=NEVER_EXPIRE,
+        help='Время жизни страниц в кеше в секундах, -1 - без ограничения'
+    )
+    parser.add_argument(
+        '--revalidate',
+        action='store_true',
+        help='Проверка актуальности страниц в кеше при каждом запросе'
+    )
     parser.add_argument(
         '-o',
         '--output',
-        choices=('pretty', 'file'),
+        choices=OUTPUTS,
         help='Дополнительные способы вывода данных'
     )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=positive_int,
+        default=DEFAULT_WORKERS,
+        help='Количество одновременных загрузок'
+    )
+    parser.add_argument(
+        '-f',
+        '--formats',
+        nargs='+',
+        choices=DOWNLOAD_FORMATS,
+        default=DEFAULT_DOWNLOAD_FORMATS,
+        help='Форматы загружаемых архивов документации'
+    )
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        action='store_true',
+        help='Загрузка только изменившихся с прошлого запуска карточек PEP'
+    )
+    parser.add_argument(
+        '-m',
+        '--memoize',
+        action='store_true',
+        help='Повторное использование данных неизменившихся страниц'
+    )
+    parser.add_argument(
+        '-e',
+        '--engine',
+        choices=ENGINES,
+        default=DEFAULT_ENGINE,
+        help='Движок загрузки страниц'
+    )
+    parser.add_argument(
+        '-p',
+        '--parser',
+        choices=PARSERS,
+        default=DEFAULT_PARSER,
+        help='Парсер страниц версий Python и карточек PEP'
+    )
+    parser.add_argument(
+        '--where',
+        type=index_filter,
+        action='append',
+        metavar='FIELD=VALUE',
+        help='Условие отбора PEP в режиме pep-index'
+    )
+    parser.add_argument(
+        '--db',
+        action='store_true',
+        help='Сохранение PEP в локальную базу SQLite в режиме pep'
+    )
+    parser.add_argument(
+        '--report',
+        choices=REPORTS,
+        default=DEFAULT_REPORT,
+        help='Отчет по локальной базе PEP в режиме query'
+    )
+    parser.add_argument(
+        '--since',
+        type=iso_date,
+        help='Дата, с которой отчет changes показывает изменения PEP'
+    )
+    parser.add_argument(
+        '--rate',
+        type=positive_float,
+        default=DEFAULT_RATE,
+        help='Максимальное количество запросов к хосту в секунду'
+    )
+    parser.add_argument(
+        '--retries',
+        type=non_negative_int,
+        default=DEFAULT_RETRIES,
+        help='Количество повторов запроса при ошибках и ответах 429, 5xx'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=positive_float,
+        default=DEFAULT_TIMEOUT,
+        help='Таймаут запроса в секундах'
+    )
+    parser.add_argument(
+        '--connect-timeout',
+        type=positive_float,
+        help='Таймаут установки соединения в секундах, по умолчанию --timeout'
+    )
+    parser.add_argument(
+        '--pool-size',
+        type=positive_int,
+        help='Размер пула соединений к хосту, по умолчанию не меньше --workers'
+    )
+    parser.add_argument(
+        '--keepalive',
+        type=positive_int,
+        metavar='IDLE',
+        help='TCP keep-alive для соединений пула после IDLE секунд простоя'
+    )
+    parser.add_argument(
+        '--http2',
+        action='store_true',
+        help='Загрузка страниц по HTTP/2 через httpx'
+    )
+    parser.add_argument(
+        '--dump-dir',
+        type=Path,
+        nargs='?',
+        const=DUMP_DIR,
+        help='Директория для страниц, на которых не найдены элементы'
+    )
+    parser.add_argument(
+        '--log-format',
+        choices=LOG_FORMATS,
+        default=DEFAULT_LOG_FORMAT,
+        help='Формат записей лога'
+    )
+    parser.add_argument(
+        '--log-policy',
+        choices=LOG_POLICIES,
+        default=DEFAULT_LOG_POLICY,
+        help='Ожидать место в заполненной очереди лога или пропускать записи'
+    )
+    parser.add_argument(
+        '--log-queue-size',
+        type=positive_int,
+        default=LOG_QUEUE_SIZE,
+        help='Размер очереди записей лога'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Вывод времени работы по фазам'
+    )
+    parser.add_argument(
+        '--profile-file',
+        type=Path,
+        help='Файл для сохранения профиля в формате JSON'
+    )
+    parser.add_argument(
+        '--metrics-file',
+        type=Path,
+        help='Файл метрик Prometheus для textfile коллектора'
+    )
+    parser.add_argument(
+        '--metrics-port',
+        type=positive_int,
+        help='Порт HTTP сервера с метриками Prometheus на /metrics'
+    )
+    parser.add_argument(
+        '--watch',
+        type=positive_int,
+        metavar='INTERVAL',
+        help='Повторный запуск режима каждые INTERVAL секунд'
+    )
     return parser
 
 
-def configure_logging():
+def configure_logging(cli_args=None):
+    """Настраивает запись лога в файл и консоль из фонового потока."""
     LOG_PATH.mkdir(exist_ok=True)
     rotating_handler = RotatingFileHandler(
         LOG_FILE, maxBytes=10 ** 6, backupCount=5
     )
-    logging.basicConfig(
-        datefmt=DT_FORMAT,
-        format=LOG_FORMAT,
-        level=logging.INFO,
-        handlers=(rotating_handler, logging.StreamHandler())
+    pipeline = LogPipeline(
+        (rotating_handler, logging.StreamHandler()),
+        queue_size=getattr(cli_args, 'log_queue_size', LOG_QUEUE_SIZE),
+        policy=getattr(cli_args, 'log_policy', DEFAULT_LOG_POLICY),
+        log_format=getattr(cli_args, 'log_format', DEFAULT_LOG_FORMAT)
+    )
+    logging.basicConfig(level=logging.INFO, handlers=(pipeline.handler,))
+    pipeline.start()
+    atexit.register(pipeline.stop)
+    return pipeline
+
+
+def configure_adapter(cli_args):
+    """Возвращает транспорт сессии с пулом соединений на каждый хост.
+
+    По умолчанию пул не меньше количества одновременных загрузок, при
+    занятом пуле запрос ждет свободное соединение.
+    """
+    timeout = getattr(cli_args, 'timeout', DEFAULT_TIMEOUT)
+    connect_timeout = getattr(cli_args, 'connect_timeout', None)
+    pool_size = getattr(cli_args, 'pool_size', None) or max(
+        DEFAULT_POOL_SIZE, getattr(cli_args, 'workers', DEFAULT_WORKERS)
+    )
+    adapter_class = (
+        HTTP2Adapter if getattr(cli_args, 'http2', False)
+        else SchedulingAdapter
+    )
+    return adapter_class(
+        rate=getattr(cli_args, 'rate', DEFAULT_RATE),
+        retries=getattr(cli_args, 'retries', DEFAULT_RETRIES),
+        timeout=(
+            timeout if connect_timeout is None else (connect_timeout, timeout)
+        ),
+        keepalive=getattr(cli_args, 'keepalive', None),
+        pool_maxsize=pool_size,
+        pool_block=True
+    )
+
+
+def configure_session(cli_args):
+    """Возвращает кешируемую сессию с условной перепроверкой страниц."""
+    import requests_cache
+    session = requests_cache.CachedSession(
+        backend=create_cache_backend(cli_args),
+        expire_after=cli_args.max_age,
+        always_revalidate=(
+            cli_args.revalidate or getattr(cli_args, 'watch', None) is not None
+        )
     )
+    adapter = configure_adapter(cli_args)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.cache_stats = CacheStats()
+    if cli_args.clear_cache:
+        session.cache.clear()
+    return session
@@ -1,3 +1,4 @@
+from http import HTTPStatus
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent
@@ -18,6 +19,52 @@ LOG_FORMAT = '"%(asctime)s - [%(levelname)s] - %(message)s"'
 
 DOWNLOADS_DIR = 'downloads'
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+DOWNLOAD_ATTEMPTS = 3
+
+DOWNLOAD_FORMATS = {
+    'pdf-a4': r'.+pdf-a4\.zip$',
+    'pdf-letter': r'.+pdf-letter\.zip$',
+    'html': r'.+html\.zip$',
+    'text': r'.+text\.zip$',
+    'epub': r'.+\.epub$',
+}
+
+DEFAULT_DOWNLOAD_FORMATS = ('pdf-a4',)
+
+CACHE_NAME = BASE_DIR / 'http_cache'
+
+NEVER_EXPIRE = -1
+
+CACHE_BACKENDS = ('sqlite', 'filesystem', 'redis')
+
+DEFAULT_CACHE_BACKEND = 'sqlite'
+
+DEFAULT_CACHE_URL = 'redis://localhost:6379/0'
+
+MEMO_DIR = BASE_DIR / 'memo'
+
+PEP_SNAPSHOT_FILE = BASE_DIR / 'snapshots' / 'pep.json'
+
+DEFAULT_WORKERS = 1
+
+ENGINES = ('sync', 'async', 'process')
+
+DEFAULT_ENGINE = 'sync'
+
+PARSE_BATCH_SIZE = 16
+
+PARSERS = ('bs4', 'lxml')
+
+DEFAULT_PARSER = 'bs4'
+
+OUTPUTS = ('pretty', 'file', 'jsonl', 'arrow', 'parquet')
+
+CONSOLE_OUTPUTS = (None, 'pretty')
+
+OUTPUT_BATCH_SIZE = 1000
+
 EXPECTED_STATUS = {
     'A': ('Active', 'Accepted'),
     'D': ('Deferred',),
@@ -41,4 +88,96 @@ TABLE_HEADER_WHATS_NEW = ('Ссылка на статью', 'Заголовок'
 
 TABLE_HEADER_STATUS_COUNT = ('Статус', 'Количество')
 
+TABLE_HEADER_PEP_INDEX = (
+    'Номер', 'Название', 'Статус', 'Тип', 'Авторы', 'Создан',
+    'Версия Python', 'Требует', 'Заменяет', 'Заменен'
+)
+
 TABLE_FOOTER_STATUS_TOTAL = 'Total'
+
+TABLE_HEADER_MISMATCHES = (
+    'Номер', 'Ссылка на PEP', 'Ключ статуса', 'Статус в карточке'
+)
+
+TABLE_HEADER_CHANGES = ('Номер', 'Ссылка на PEP', 'Статус', 'Изменен')
+
+METRICS_PREFIX = 'pep_parser'
+
+METRICS_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+
+DEFAULT_RATE = 10.0
+
+DEFAULT_RETRIES = 3
+
+DEFAULT_TIMEOUT = 30.0
+
+BACKOFF_BASE = 0.5
+
+BACKOFF_MAX = 30.0
+
+RETRY_AFTER_MAX = 120.0
+
+RETRY_STATUSES = frozenset((
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+))
+
+THROTTLE_STATUSES = frozenset((
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+))
+
+PEP_CARD_FIELDS = {
+    'Author': 'authors',
+    'Status': 'status',
+    'Type': 'type',
+    'Created': 'created',
+    'Python-Version': 'python_version',
+    'Requires': 'requires',
+    'Replaces': 'replaces',
+    'Superseded-By': 'superseded_by',
+}
+
+PEP_LIST_FIELDS = frozenset((
+    'authors', 'python_version', 'requires', 'replaces', 'superseded_by'
+))
+
+PEP_INDEX_FIELDS = {
+    'status': 'status',
+    'type': 'type',
+    'author': 'authors',
+    'python-version': 'python_version',
+}
+
+PEP_DB_FILE = BASE_DIR / 'pep.sqlite3'
+
+REPORTS = ('status-count', 'mismatches', 'changes')
+
+DEFAULT_REPORT = 'status-count'
+
+DUMP_DIR = BASE_DIR / 'dumps'
+
+FAILURE_EXCERPT_SIZE = 300
+
+FAILURE_URLS_LIMIT = 5
+
+LOG_QUEUE_SIZE = 10000
+
+LOG_POLICIES = ('block', 'drop')
+
+DEFAULT_LOG_POLICY = 'block'
+
+LOG_FORMATS = ('text', 'json')
+
+DEFAULT_LOG_FORMAT = 'text'
+
+ALL_MODES = ('whats-new', 'latest-versions', 'pep')
+
+DEFAULT_POOL_SIZE = 10
+
+HTTP2_KEEPALIVE_EXPIRY = 5.0
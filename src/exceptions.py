@@ -21,3 +21,13 @@ class PEPStatusNameException(Exception):
 class PEPStatusKeyException(Exception):
     """Вызывается, когда парсер возвращает невалидный ключ статуса."""
     pass
+
+
+class DownloadSizeException(Exception):
+    """Вызывается, когда размер загруженного файла не совпадает с ожидаемым."""
+    pass
+
+
+class ModeException(Exception):
+    """Вызывается, когда режимы работы парсера завершились с ошибкой."""
+    pass
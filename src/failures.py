@@ -0,0 +1,133 @@
+import logging
+import sys
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from threading import Lock
+
+from constants import FAILURE_EXCERPT_SIZE, FAILURE_URLS_LIMIT
+from exceptions import DOMQueryingException, ParserFindTagException
+
+current_page = ContextVar('current_page', default=None)
+
+
+class FailureLog:
+    """Неудачные поиски элементов, сгруппированные по сигнатуре."""
+
+    def __init__(self, dump_dir=None):
+        self.dump_dir = dump_dir
+        self.failures = {}
+        self.lock = Lock()
+
+    def add(self, signature, url):
+        """Учитывает ошибку и возвращает True для первого ее появления."""
+        with self.lock:
+            failure = self.failures.get(signature)
+            if failure is None:
+                self.failures[signature] = {'count': 1, 'urls': [url]}
+                return True
+            failure['count'] += 1
+            if len(failure['urls']) < FAILURE_URLS_LIMIT:
+                failure['urls'].append(url)
+            return False
+
+    def dump(self, page_hash, content):
+        """Сохраняет страницу целиком и возвращает путь к файлу."""
+        self.dump_dir.mkdir(parents=True, exist_ok=True)
+        dump_path = self.dump_dir / f'{page_hash}.html'
+        if not dump_path.exists():
+            dump_path.write_bytes(content)
+        return dump_path
+
+    def repeated(self):
+        """Возвращает сигнатуры, встретившиеся больше одного раза."""
+        return {
+            signature: failure
+            for signature, failure in self.failures.items()
+            if failure['count'] > 1
+        }
+
+
+failure_log = FailureLog()
+
+
+def configure_failures(dump_dir=None):
+    global failure_log
+    failure_log = FailureLog(dump_dir)
+    return failure_log
+
+
+@contextmanager
+def page_context(url, page_hash, content):
+    """Делает страницу текущей для сообщений об ошибках разбора."""
+    token = current_page.set((url, page_hash, content))
+    try:
+        yield
+    finally:
+        current_page.reset(token)
+
+
+def excerpt(text, size=FAILURE_EXCERPT_SIZE):
+    """Возвращает начало текста не длиннее size символов."""
+    return text if len(text) <= size else text[:size] + '...'
+
+
+def report_failure(signature, serialize, content_hash):
+    """Логирует ошибку поиска элемента и возвращает сообщение исключения.
+
+    serialize возвращает разметку документа, в котором шел поиск. Полностью
+    ошибка логируется только при первом появлении сигнатуры, повторы
+    учитываются и выводятся сводкой в `log_failure_summary`.
+    """
+    page = current_page.get()
+    if page is None:
+        content = serialize().encode('utf-8')
+        url, page_hash = None, content_hash(content)
+    else:
+        url, page_hash, content = page
+    message = f'{signature}\nСтраница: {url}, хеш: {page_hash}'
+    if not failure_log.add(signature, url):
+        return message
+    details = f'{message}\nФрагмент: {excerpt(serialize())}'
+    if failure_log.dump_dir is not None:
+        dump_path = failure_log.dump(page_hash, content)
+        details += f'\nСтраница сохранена: {dump_path}'
+    logging.error(details)
+    return message
+
+
+def exception_signature(exc):
+    """Возвращает тип исключения и место, где оно было выброшено."""
+    frames = traceback.extract_tb(exc.__traceback__)
+    if not frames:
+        return type(exc).__name__
+    return (
+        f'{type(exc).__name__} '
+        f'({Path(frames[-1].filename).name}:{frames[-1].lineno})'
+    )
+
+
+def log_exception(message, url):
+    """Логирует обрабатываемое исключение при разборе страницы url.
+
+    Ошибки поиска элементов логируются с трейсбеком только при первом
+    появлении сигнатуры, повторы учитываются и выводятся сводкой в
+    `log_failure_summary`. Остальные исключения логируются каждый раз.
+    """
+    exc = sys.exc_info()[1]
+    if not isinstance(exc, (DOMQueryingException, ParserFindTagException)):
+        logging.exception(f'{message}: {url}')
+        return
+    signature = f'{message}\n{exception_signature(exc)}'
+    if failure_log.add(signature, url):
+        logging.exception(f'{message}: {url}')
+
+
+def log_failure_summary():
+    """Логирует одной записью каждую повторявшуюся ошибку поиска."""
+    for signature, failure in failure_log.repeated().items():
+        urls = ', '.join(str(url) for url in failure['urls'])
+        logging.error(
+            f'{signature}\nПовторов: {failure["count"]}, страницы: {urls}'
+        )
@@ -0,0 +1,107 @@
+import copy
+import json
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import Full, Queue
+
+from constants import DT_FORMAT, LOG_FORMAT
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Передает записи лога в ограниченную очередь фонового потока.
+
+    При политике drop запись, не поместившаяся в очередь, отбрасывается
+    и учитывается в dropped, при политике block вызов ждет места в очереди.
+    Трейсбек форматируется до постановки в очередь, чтобы запись
+    не удерживала кадры стека.
+    """
+
+    def __init__(self, queue, policy):
+        super().__init__(queue)
+        self.policy = policy
+        self.dropped = 0
+        self.exc_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.exc_formatter.formatException(
+                record.exc_info
+            )
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.policy == 'block':
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            with self.lock:
+                self.dropped += 1
+
+
+class BlockingQueueListener(QueueListener):
+    """Слушатель очереди, ожидающий места для сигнала остановки."""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирует запись лога как JSON объект в одну строку."""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+LOG_FORMAT_TO_FORMATTER = {
+    'text': lambda: logging.Formatter(LOG_FORMAT, DT_FORMAT),
+    'json': lambda: JsonFormatter(datefmt=DT_FORMAT),
+}
+
+
+class LogPipeline:
+    """Очередь записей лога и фоновый поток, записывающий их в обработчики."""
+
+    def __init__(self, handlers, queue_size, policy, log_format):
+        formatter = LOG_FORMAT_TO_FORMATTER[log_format]()
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        self.handler = BoundedQueueHandler(Queue(queue_size), policy)
+        self.listener = BlockingQueueListener(
+            self.handler.queue, *handlers, respect_handler_level=True
+        )
+        self.running = False
+
+    def start(self):
+        self.listener.start()
+        self.running = True
+
+    def stop(self):
+        """Дописывает очередь и сообщает о пропущенных записях."""
+        if not self.running:
+            return
+        self.listener.stop()
+        self.running = False
+        if self.handler.dropped:
+            self.listener.handle(logging.makeLogRecord({
+                'levelno': logging.WARNING,
+                'levelname': logging.getLevelName(logging.WARNING),
+                'msg': f'Пропущено записей лога: {self.handler.dropped}',
+            }))
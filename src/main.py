@@ -1,27 +1,118 @@
+import datetime as dt
 import logging
 import re
+from argparse import Namespace
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from time import sleep
 from urllib.parse import urljoin
 
-import requests_cache
 from requests import RequestException
-from tqdm import tqdm
 
-from configs import configure_argument_parser, configure_logging
-from constants import (BASE_DIR, DOWNLOADS_DIR, EXPECTED_STATUS, MAIN_DOC_URL,
+from cache import close_session
+from configs import (configure_argument_parser, configure_logging,
+                     configure_session)
+from constants import (ALL_MODES, BASE_DIR, CONSOLE_OUTPUTS,
+                       DEFAULT_DOWNLOAD_FORMATS, DEFAULT_ENGINE,
+                       DEFAULT_PARSER, DEFAULT_REPORT, DEFAULT_WORKERS,
+                       DOWNLOAD_FORMATS, DOWNLOADS_DIR, EXPECTED_STATUS,
+                       MAIN_DOC_URL, MEMO_DIR, PEP_DB_FILE, PEP_SNAPSHOT_FILE,
                        PEPS_URL, TABLE_FOOTER_STATUS_TOTAL,
-                       TABLE_HEADER_LATEST_VERSIONS, TABLE_HEADER_STATUS_COUNT,
-                       TABLE_HEADER_WHATS_NEW, VALID_STATUS,
-                       VERSION_AND_STATUS_PATTERN)
-from exceptions import (DOMQueryingException, ParserFindTagException,
-                        PEPStatusKeyException, PEPStatusNameException,
-                        PEPVersionException)
+                       TABLE_HEADER_LATEST_VERSIONS, TABLE_HEADER_PEP_INDEX,
+                       TABLE_HEADER_STATUS_COUNT, TABLE_HEADER_WHATS_NEW,
+                       VALID_STATUS, VERSION_AND_STATUS_PATTERN)
+from exceptions import (DOMQueryingException, ModeException,
+                        ParserFindTagException, PEPStatusKeyException,
+                        PEPStatusNameException, PEPVersionException)
+from failures import configure_failures, log_exception, log_failure_summary
+from memo import ParsedPageMemo
+from metrics import collect_metrics, increment, track_run
 from outputs import control_output
-from utils import (download_file, find_tag, find_tag_all, get_soup_by_url,
-                   select_one_tag, select_tag_all)
+from pep_db import REPORT_TO_FUNCTION, connect_pep_db, save_peps
+from pep_index import PEPIndex, card_fields, make_record
+from snapshots import load_snapshot, save_snapshot
+from timings import enable_profiling, print_profile
+from utils import (completed_future, download_files, element_text,
+                   extract_by_urls, find_tag, find_tag_all, get_soup_by_url,
+                   in_order, progress, select_one_tag, select_tag_all,
+                   xpath_one_tag, xpath_tag_all)
 
+MEMOS = {}
 
-def whats_new(session):
+
+def get_memo(cli_args):
+    """Возвращает кеш разбора страниц режима, общий для циклов --watch.
+
+    Без --memoize в режиме --watch кеш хранится только в памяти.
+    """
+    memoize = getattr(cli_args, 'memoize', False)
+    if not memoize and getattr(cli_args, 'watch', None) is None:
+        return None
+    file_path = MEMO_DIR / f'{cli_args.mode}.json' if memoize else None
+    key = (cli_args.mode, file_path)
+    if key not in MEMOS:
+        MEMOS[key] = ParsedPageMemo(file_path)
+    return MEMOS[key]
+
+
+def extract_pages(session, urls, extract, cli_args=None):
+    """Загружает страницы и извлекает данные с настройками из аргументов."""
+    memo = get_memo(cli_args)
+    parser = getattr(cli_args, 'parser', DEFAULT_PARSER)
+    try:
+        yield from extract_by_urls(
+            session,
+            urls,
+            extract,
+            workers=getattr(cli_args, 'workers', DEFAULT_WORKERS),
+            engine=getattr(cli_args, 'engine', DEFAULT_ENGINE),
+            parser=parser,
+            memo=memo.scoped(parser, extract) if memo is not None else None
+        )
+    finally:
+        if memo is not None:
+            memo.save()
+
+
+def get_version_info(soup):
+    """Возвращает заголовок и авторов со страницы версии Python."""
+    h1 = find_tag(soup, 'h1')
+    dl = find_tag(soup, 'dl')
+    return h1.text, dl.text.replace('\n', ' ')
+
+
+def get_version_info_lxml(tree):
+    """Возвращает заголовок и авторов со страницы версии Python через XPath."""
+    h1 = xpath_one_tag(tree, '//h1')
+    dl = xpath_one_tag(tree, '//dl')
+    return element_text(h1), element_text(dl).replace('\n', ' ')
+
+
+def extract_version_infos(session, sections, parse_version_info, cli_args):
+    """Возвращает ссылки и строки результатов по мере загрузки страниц.
+
+    Для страниц, которые не удалось разобрать, строка результатов - None.
+    """
+    for version_link, version_info in progress(
+        extract_pages(session, sections, parse_version_info, cli_args),
+        total=len(sections),
+        cli_args=cli_args
+    ):
+        try:
+            _, (h1_text, dl_text) = version_info.result()
+            yield version_link, (version_link, h1_text, dl_text)
+        except (
+            DOMQueryingException, ParserFindTagException, RequestException
+        ):
+            log_exception(
+                'Ошибка распарсивания информации о версии Python',
+                version_link
+            )
+            yield version_link, None
+
+
+def whats_new(session, cli_args=None):
     """Возвращает информацию из раздела `Что нового`."""
     whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
     soup = get_soup_by_url(session, whats_new_url)
@@ -30,26 +121,28 @@ def whats_new(session):
     sections_by_python = find_tag_all(
         div_with_ul, 'li', attrs={'class': 'toctree-l1'}
     )
-    results = []
-    for section in tqdm(sections_by_python):
+    parse_version_info = PARSER_TO_VERSION_INFO[
+        getattr(cli_args, 'parser', DEFAULT_PARSER)
+    ]
+    sections = {}
+    for section in sections_by_python:
         try:
             version_a_tag = find_tag(section, 'a', href=True)
             version_link = urljoin(whats_new_url, version_a_tag['href'])
-            soup = get_soup_by_url(session, version_link)
-            h1 = find_tag(soup, 'h1')
-            dl = find_tag(soup, 'dl')
-            dl_text = dl.text.replace('\n', ' ')
-            results.append(
-                (version_link, h1.text, dl_text)
-            )
-        except (ParserFindTagException, RequestException):
-            logging.exception(
-                f'Ошибка распарсивания информации о версии Python: {section}'
+            sections[version_link] = section
+        except ParserFindTagException:
+            log_exception(
+                'Ошибка распарсивания информации о версии Python',
+                whats_new_url
             )
-    return [TABLE_HEADER_WHATS_NEW] + results if results else results
+    yield TABLE_HEADER_WHATS_NEW
+    yield from in_order(
+        sections,
+        extract_version_infos(session, sections, parse_version_info, cli_args)
+    )
 
 
-def latest_versions(session):
+def latest_versions(session, cli_args=None):
     """Возвращает список версий."""
     soup = get_soup_by_url(session, MAIN_DOC_URL)
     sidebar = find_tag(soup, 'div', {'class': 'sphinxsidebarwrapper'})
@@ -62,7 +155,7 @@ def latest_versions(session):
         err_msg = 'С сервера возвращен пустой список версий!'
         logging.error(err_msg)
         raise PEPVersionException(err_msg)
-    results = []
+    yield TABLE_HEADER_LATEST_VERSIONS
     for a_tag in a_tags:
         link = a_tag['href']
         text_match = re.search(
@@ -73,109 +166,431 @@ def latest_versions(session):
                 if text_match else
                 (a_tag.text, '')
         )
-        results.append(
-            (link, version, status)
-        )
-    return [TABLE_HEADER_LATEST_VERSIONS] + results if results else results
+        yield link, version, status
 
 
-def download(session):
-    """Загрузка файла с документацией."""
+def download(session, cli_args=None):
+    """Загрузка архивов с документацией."""
+    formats = getattr(cli_args, 'formats', DEFAULT_DOWNLOAD_FORMATS)
     downloads_url = urljoin(MAIN_DOC_URL, 'download.html')
     soup = get_soup_by_url(session, downloads_url)
     table_tag = find_tag(soup, 'table',  attrs={'class': 'docutils'})
-    pdf_a4_tag = find_tag(
-        table_tag, 'a', {'href': re.compile(r'.+pdf-a4\.zip$')}
-    )
-    archive_url = urljoin(downloads_url, pdf_a4_tag['href'])
-    filename = archive_url.split('/')[-1]
     download_path = BASE_DIR / DOWNLOADS_DIR
     download_path.mkdir(exist_ok=True)
-    archive_path = download_path / filename
-    download_file(session, archive_url, archive_path)
+    archives = {}
+    for archive_format in formats:
+        archive_tags = find_tag_all(
+            table_tag,
+            'a',
+            {'href': re.compile(DOWNLOAD_FORMATS[archive_format])}
+        )
+        for archive_tag in archive_tags:
+            archive_url = urljoin(downloads_url, archive_tag['href'])
+            filename = archive_url.split('/')[-1]
+            archives[archive_url] = download_path / filename
+    download_files(
+        session, archives, getattr(cli_args, 'workers', DEFAULT_WORKERS)
+    )
+
 
+def parse_pep_record(pep):
+    """Возвращает номер, URL и ожидаемые статусы PEP из строки индекса."""
+    pep_status_key = select_one_tag(
+        pep, 'td:nth-child(1) > abbr'
+    ).text[1:]
+    pep_reference = select_one_tag(
+        pep,
+        'td:nth-child(2) > a[class="pep reference internal"][href]'
+    )
+    pep_number = pep_reference.text
+    pep_url = urljoin(PEPS_URL, pep_reference['href'])
+    expected_status = EXPECTED_STATUS.get(pep_status_key)
+    if expected_status is None:
+        error_msg = (
+            f'Невалидный ключ статуса PEP {pep_number}: '
+            f'{pep_status_key}. '
+            f'URL страницы PEP: {pep_url}'
+        )
+        raise PEPStatusKeyException(error_msg)
+    return pep_number, pep_url, pep_status_key, expected_status
+
+
+def pep_record_location(row_number):
+    """Возвращает место строки индекса PEP для сообщений об ошибках."""
+    return f'{PEPS_URL} (строка индекса {row_number})'
+
+
+def get_pep_title(pep):
+    """Возвращает название PEP из строки индекса, если оно там есть."""
+    title = pep.select_one('td:nth-child(3)')
+    return title.text if title is not None else ''
+
+
+def check_pep_status(pep_number, pep_url, pep_status, expected_status):
+    """Проверяет статус из карточки PEP и возвращает его."""
+    if pep_status not in expected_status:
+        increment('status_mismatches_total')
+        logging.info(
+            f'Несовпадающие статусы: {pep_url}. '
+            f'Статус в карточке: {pep_status}. '
+            f'Ожидаемые статусы: {expected_status}'
+        )
+    if pep_status not in VALID_STATUS:
+        error_msg = (
+            f'Невалидный статус PEP {pep_number} '
+            f'в карточке: {pep_status}. '
+            f'Страница PEP: {pep_url}'
+        )
+        raise PEPStatusNameException(error_msg)
+    return pep_status
+
+
+def get_pep_status(pep_soup):
+    """Возвращает статус PEP из карточки."""
+    return select_one_tag(
+        pep_soup,
+        '#pep-content > dl > dt:-soup-contains("Status") + dd > abbr'
+    ).text
+
+
+def get_pep_status_lxml(pep_tree):
+    """Возвращает статус PEP из карточки через XPath."""
+    return element_text(xpath_one_tag(
+        pep_tree,
+        '//*[@id="pep-content"]/dl/dt[contains(., "Status")]'
+        '/following-sibling::*[1][self::dd]/abbr'
+    ))
 
-def pep(session):
+
+def get_peps_for_update(peps_records, snapshot, peps_status_count):
+    """Возвращает PEP, строка индекса которых изменилась с прошлого запуска.
+
+    Статусы остальных PEP берутся из снимка и учитываются в подсчете.
+    """
+    peps = {}
+    for row_number, pep in enumerate(peps_records, 1):
+        try:
+            pep_number, pep_url, pep_status_key, expected_status = (
+                parse_pep_record(pep)
+            )
+        except DOMQueryingException:
+            log_exception(
+                'Ошибка распарсивания документации PEP',
+                pep_record_location(row_number)
+            )
+            continue
+        except PEPStatusKeyException as exc:
+            logging.exception(exc)
+            continue
+        pep_row = str(pep)
+        pep_snapshot = snapshot.get(pep_url)
+        if pep_snapshot is not None and pep_snapshot['row'] == pep_row:
+            peps_status_count[pep_snapshot['status']] += 1
+            continue
+        peps[pep_url] = (expected_status, {
+            'number': pep_number,
+            'row': pep_row,
+            'status_key': pep_status_key,
+            'title': get_pep_title(pep),
+        })
+    return peps
+
+
+def pep(session, cli_args=None):
     """Возвращает количество PEP в каждом статусе."""
+    incremental = getattr(cli_args, 'incremental', False)
+    parse_pep_status = PARSER_TO_PEP_STATUS[
+        getattr(cli_args, 'parser', DEFAULT_PARSER)
+    ]
     soup = get_soup_by_url(session, PEPS_URL)
     peps_records = select_tag_all(
         soup, '#numerical-index tbody > tr'
     )
+    snapshot = load_snapshot(PEP_SNAPSHOT_FILE) if incremental else {}
+    fetched_at = dt.datetime.now(dt.timezone.utc).isoformat(
+        timespec='seconds'
+    )
     peps_status_count = defaultdict(int)
-    for pep in tqdm(peps_records):
+    peps = get_peps_for_update(peps_records, snapshot, peps_status_count)
+    for pep_url, pep_page in progress(
+        extract_pages(session, peps, parse_pep_status, cli_args),
+        total=len(peps),
+        cli_args=cli_args
+    ):
+        expected_status, pep_entry = peps[pep_url]
+        pep_number = pep_entry['number']
         try:
-            pep_status_key = select_one_tag(
-                pep, 'td:nth-child(1) > abbr'
-            ).text[1:]
-            pep_reference = select_one_tag(
-                pep,
-                'td:nth-child(2) > a[class="pep reference internal"][href]'
+            pep_hash, pep_status = pep_page.result()
+            pep_status = check_pep_status(
+                pep_number, pep_url, pep_status, expected_status
             )
-            pep_number = pep_reference.text
-            pep_url = urljoin(PEPS_URL, pep_reference['href'])
-            expected_status = EXPECTED_STATUS.get(pep_status_key)
-            if expected_status is None:
-                error_msg = (
-                    f'Невалидный ключ статуса PEP {pep_number}: '
-                    f'{pep_status_key}. '
-                    f'URL страницы PEP: {pep_url}'
-                )
-                raise PEPStatusKeyException(error_msg)
-            pep_soup = get_soup_by_url(session, pep_url)
-            pep_status = select_one_tag(
-                pep_soup,
-                '#pep-content > dl > dt:-soup-contains("Status") + dd > abbr'
-            ).text
-            if pep_status not in expected_status:
-                logging.info(
-                    f'Несовпадающие статусы: {pep_url}. '
-                    f'Статус в карточке: {pep_status}. '
-                    f'Ожидаемые статусы: {expected_status}'
-                )
-            if pep_status not in VALID_STATUS:
-                error_msg = (
-                    f'Невалидный статус PEP {pep_number} '
-                    f'в карточке: {pep_status}. '
-                    f'Страница PEP: {pep_url}'
-                )
-                raise PEPStatusNameException(error_msg)
             peps_status_count[pep_status] += 1
+            snapshot[pep_url] = {
+                **pep_entry,
+                'status': pep_status,
+                'content_hash': pep_hash,
+                'fetched_at': fetched_at,
+            }
         except (
             DOMQueryingException, ParserFindTagException, RequestException
         ):
-            logging.exception(
-                f'Ошибка распарсивания документации PEP {pep_number}!'
-            )
-        except (PEPStatusNameException, PEPStatusKeyException) as exc:
+            log_exception('Ошибка распарсивания документации PEP', pep_url)
+        except PEPStatusNameException as exc:
             logging.exception(exc)
-    return [
-        TABLE_HEADER_STATUS_COUNT,
-        *sorted(peps_status_count.items()),
-        (TABLE_FOOTER_STATUS_TOTAL, sum(peps_status_count.values())),
+    if incremental:
+        save_snapshot(PEP_SNAPSHOT_FILE, snapshot)
+    if getattr(cli_args, 'db', False):
+        save_peps(PEP_DB_FILE, snapshot)
+    yield TABLE_HEADER_STATUS_COUNT
+    yield from sorted(peps_status_count.items())
+    yield TABLE_FOOTER_STATUS_TOTAL, sum(peps_status_count.values())
+
+
+def get_pep_fields(pep_soup):
+    """Возвращает название и поля заголовка карточки PEP."""
+    return card_fields(
+        find_tag(pep_soup, 'h1').text,
+        (
+            (dt.text, dt.find_next_sibling('dd').text)
+            for dt in select_tag_all(pep_soup, '#pep-content > dl > dt')
+        )
+    )
+
+
+def get_pep_fields_lxml(pep_tree):
+    """Возвращает название и поля заголовка карточки PEP через XPath."""
+    return card_fields(
+        element_text(xpath_one_tag(pep_tree, '//h1')),
+        (
+            (element_text(dt), element_text(dt.getnext()))
+            for dt in xpath_tag_all(pep_tree, '//*[@id="pep-content"]/dl/dt')
+        )
+    )
+
+
+def build_pep_index(session, cli_args=None):
+    """Возвращает индекс метаданных PEP из карточек."""
+    parse_pep_fields = PARSER_TO_PEP_FIELDS[
+        getattr(cli_args, 'parser', DEFAULT_PARSER)
     ]
+    soup = get_soup_by_url(session, PEPS_URL)
+    peps = {}
+    peps_records = select_tag_all(soup, '#numerical-index tbody > tr')
+    for row_number, pep in enumerate(peps_records, 1):
+        try:
+            pep_number, pep_url, _, _ = parse_pep_record(pep)
+        except DOMQueryingException:
+            log_exception(
+                'Ошибка распарсивания документации PEP',
+                pep_record_location(row_number)
+            )
+            continue
+        except PEPStatusKeyException as exc:
+            logging.exception(exc)
+            continue
+        peps[pep_url] = pep_number
+    index = PEPIndex()
+    for pep_url, pep_page in progress(
+        extract_pages(session, peps, parse_pep_fields, cli_args),
+        total=len(peps),
+        cli_args=cli_args
+    ):
+        try:
+            _, pep_fields = pep_page.result()
+            index.add(make_record(peps[pep_url], pep_url, pep_fields))
+        except (
+            DOMQueryingException, ParserFindTagException, RequestException
+        ):
+            log_exception('Ошибка распарсивания документации PEP', pep_url)
+    return index
+
+
+def pep_index(session, cli_args=None):
+    """Возвращает метаданные PEP, отобранные по вторичным индексам."""
+    index = build_pep_index(session, cli_args)
+    yield TABLE_HEADER_PEP_INDEX
+    for record in index.find(*(getattr(cli_args, 'where', None) or ())):
+        yield (
+            record.number,
+            record.title,
+            record.status,
+            record.type,
+            ', '.join(record.authors),
+            record.created,
+            ', '.join(record.python_version),
+            ', '.join(record.requires),
+            ', '.join(record.replaces),
+            ', '.join(record.superseded_by),
+        )
+
 
+def query(session, cli_args=None):
+    """Возвращает отчет по локальной базе PEP без загрузки страниц."""
+    report = getattr(cli_args, 'report', DEFAULT_REPORT)
+    with closing(connect_pep_db(PEP_DB_FILE)) as db:
+        yield from REPORT_TO_FUNCTION[report](db, cli_args)
+
+
+PARSER_TO_VERSION_INFO = {
+    'bs4': get_version_info,
+    'lxml': get_version_info_lxml,
+}
+
+PARSER_TO_PEP_STATUS = {
+    'bs4': get_pep_status,
+    'lxml': get_pep_status_lxml,
+}
+
+PARSER_TO_PEP_FIELDS = {
+    'bs4': get_pep_fields,
+    'lxml': get_pep_fields_lxml,
+}
 
 MODE_TO_FUNCTION = {
     'whats-new': whats_new,
     'latest-versions': latest_versions,
     'download': download,
     'pep': pep,
+    'pep-index': pep_index,
+    'query': query,
 }
 
 
+def run_mode(session, cli_args):
+    """Выполняет режим парсера и выводит результаты по мере готовности."""
+    with track_run(cli_args):
+        results = MODE_TO_FUNCTION[cli_args.mode](session, cli_args)
+        if results is not None:
+            control_output(results, cli_args)
+
+
+def collect_results(session, cli_args):
+    """Выполняет режим работы парсера и возвращает список результатов."""
+    with track_run(cli_args):
+        results = MODE_TO_FUNCTION[cli_args.mode](session, cli_args)
+        return None if results is None else list(results)
+
+
+def split_modes(cli_args):
+    """Возвращает аргументы командной строки для каждого выбранного режима.
+
+    Режим all заменяется режимами ALL_MODES, повторы режимов отбрасываются.
+    """
+    modes = []
+    for mode in cli_args.mode:
+        modes.extend(ALL_MODES if mode == 'all' else (mode,))
+    return [
+        Namespace(**{
+            **vars(cli_args), 'mode': mode, 'progress_position': position
+        })
+        for position, mode in enumerate(dict.fromkeys(modes))
+    ]
+
+
+def run_concurrently(function, session, modes_args):
+    """Выполняет функцию для каждого режима, несколько режимов - в потоках.
+
+    Возвращает пары (аргументы режима, future) в порядке режимов.
+    """
+    if len(modes_args) == 1:
+        try:
+            futures = [completed_future(function(session, modes_args[0]))]
+        except Exception as exc:
+            futures = [completed_future(exception=exc)]
+        return zip(modes_args, futures)
+    with ThreadPoolExecutor(max_workers=len(modes_args)) as executor:
+        futures = [
+            executor.submit(function, session, cli_args)
+            for cli_args in modes_args
+        ]
+    return zip(modes_args, futures)
+
+
+def run_mode_quietly(session, cli_args):
+    """Выполняет режим, который выводит результаты в консоль, без вывода.
+
+    Возвращает список результатов, чтобы вывод одновременно выполняемых
+    режимов не перемешивался. Результаты в файлы записываются сразу.
+    """
+    if getattr(cli_args, 'output', None) in CONSOLE_OUTPUTS:
+        return collect_results(session, cli_args)
+    run_mode(session, cli_args)
+
+
+def run_modes(session, *modes_args):
+    """Выполняет режимы одновременно с общей сессией и кешем.
+
+    Результаты каждого режима выводятся отдельно в порядке режимов, ошибка
+    режима не останавливает остальные.
+    """
+    failed = []
+    function = run_mode if len(modes_args) == 1 else run_mode_quietly
+    for cli_args, future in run_concurrently(function, session, modes_args):
+        if future.exception() is not None:
+            logging.error(
+                f'Ошибка выполнения режима {cli_args.mode}',
+                exc_info=future.exception()
+            )
+            failed.append(cli_args.mode)
+        elif future.result() is not None:
+            control_output(future.result(), cli_args)
+    if failed:
+        raise ModeException(
+            f'Режимы завершились с ошибкой: {", ".join(failed)}'
+        )
+
+
+def watch(session, *modes_args):
+    """Повторяет режимы по таймеру и выводит только изменившиеся результаты."""
+    previous_results = {}
+    try:
+        while True:
+            for cli_args, future in run_concurrently(
+                collect_results, session, modes_args
+            ):
+                try:
+                    results = future.result()
+                except Exception:
+                    logging.exception(
+                        f'Ошибка выполнения режима {cli_args.mode}, '
+                        f'повтор через {cli_args.watch} с.'
+                    )
+                    continue
+                if (
+                    results is not None
+                    and results != previous_results.get(cli_args.mode)
+                ):
+                    control_output(results, cli_args)
+                else:
+                    logging.info('Результаты не изменились.')
+                previous_results[cli_args.mode] = results
+            sleep(modes_args[0].watch)
+    except KeyboardInterrupt:
+        logging.info('Отслеживание остановлено.')
+
+
 def main():
-    configure_logging()
-    logging.info('Парсер запущен!')
-    arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
+    arg_parser = configure_argument_parser((*MODE_TO_FUNCTION, 'all'))
     args = arg_parser.parse_args()
+    configure_logging(args)
+    logging.info('Парсер запущен!')
     logging.info(f'Аргументы командной строки: {args}')
-    session = requests_cache.CachedSession()
-    if args.clear_cache:
-        session.cache.clear()
-    parser_mode = args.mode
-    results = MODE_TO_FUNCTION[parser_mode](session)
-    if results is not None:
-        control_output(results, args)
+    profile = args.profile or args.profile_file is not None
+    if profile:
+        enable_profiling()
+    configure_failures(args.dump_dir)
+    session = configure_session(args)
+    try:
+        with collect_metrics(args):
+            if args.watch is not None:
+                watch(session, *split_modes(args))
+            else:
+                run_modes(session, *split_modes(args))
+    finally:
+        close_session(session, args)
+        log_failure_summary()
+    if profile:
+        print_profile(args.profile_file)
     logging.info('Парсер завершил работу.')
 
 
@@ -0,0 +1,76 @@
+import json
+import logging
+from threading import Lock
+
+
+class ParsedPageMemo:
+    """Данные, извлеченные со страниц, по ключу и хешу содержимого страницы.
+
+    Ключ включает парсер и функцию извлечения данных, в файл сохраняются
+    только страницы, запрошенные с момента загрузки memo.
+    """
+
+    def __init__(self, file_path=None):
+        self.file_path = file_path
+        self.lock = Lock()
+        self.pages = {}
+        self.seen = set()
+        if file_path is None:
+            return
+        try:
+            with open(file_path, encoding='utf-8') as file:
+                self.pages = json.load(file)
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            logging.exception(
+                f'Кеш разбора повреждён и будет пересоздан: {file_path}'
+            )
+
+    def get(self, key, page_hash):
+        with self.lock:
+            self.seen.add(key)
+            page = self.pages.get(key)
+        if page is not None and page['hash'] == page_hash:
+            return page['data']
+        return None
+
+    def set(self, key, page_hash, data):
+        with self.lock:
+            self.seen.add(key)
+            self.pages[key] = {'hash': page_hash, 'data': data}
+
+    def scoped(self, parser, extract):
+        """Возвращает записи memo для парсера и функции извлечения данных."""
+        return ScopedMemo(self, f'{parser}:{extract.__name__}')
+
+    def save(self):
+        """Сохраняет страницы, запрошенные в текущем запуске."""
+        if self.file_path is None:
+            return
+        self.file_path.parent.mkdir(exist_ok=True)
+        tmp_path = self.file_path.with_suffix('.tmp')
+        with self.lock, open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(
+                {
+                    key: page for key, page in self.pages.items()
+                    if key in self.seen
+                },
+                file,
+                ensure_ascii=False
+            )
+        tmp_path.replace(self.file_path)
+
+
+class ScopedMemo:
+    """Записи memo одного парсера и функции извлечения данных по url."""
+
+    def __init__(self, memo, scope):
+        self.memo = memo
+        self.scope = scope
+
+    def get(self, url, page_hash):
+        return self.memo.get(f'{self.scope} {url}', page_hash)
+
+    def set(self, url, page_hash, data):
+        self.memo.set(f'{self.scope} {url}', page_hash, data)
@@ -0,0 +1,260 @@
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+
+from constants import METRICS_LATENCY_BUCKETS, METRICS_PREFIX
+
+METRICS = {
+    'request_duration_seconds': (
+        'histogram', 'Время загрузки страниц в секундах'
+    ),
+    'request_retries_total': (
+        'counter', 'Количество повторов запросов по причинам'
+    ),
+    'request_timeouts_total': ('counter', 'Количество таймаутов запросов'),
+    'cache_hits_total': ('counter', 'Количество ответов из кеша'),
+    'cache_misses_total': ('counter', 'Количество ответов из сети'),
+    'cache_hit_ratio': ('gauge', 'Доля ответов из кеша'),
+    'pages_parsed_total': ('counter', 'Количество разобранных страниц'),
+    'errors_total': ('counter', 'Количество ошибок по классам исключений'),
+    'status_mismatches_total': (
+        'counter', 'Количество несовпадающих статусов PEP'
+    ),
+    'run_duration_seconds': ('gauge', 'Длительность запуска в секундах'),
+    'last_run_success': ('gauge', 'Успешность последнего запуска'),
+    'last_run_timestamp_seconds': (
+        'gauge', 'Время завершения последнего запуска'
+    ),
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+registry = None
+write_lock = Lock()
+
+
+class MetricsRegistry:
+    """Счетчики, гистограммы и индикаторы в формате Prometheus."""
+
+    def __init__(self, buckets=METRICS_LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.values = defaultdict(dict)
+        self.lock = Lock()
+
+    def increment(self, name, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            metric = self.values[name]
+            metric[key] = metric.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.values[name][tuple(sorted(labels.items()))] = value
+
+    def observe(self, name, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            metric = self.values[name]
+            if key not in metric:
+                metric[key] = [[0] * len(self.buckets), 0, 0]
+            buckets, _, _ = histogram = metric[key]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    buckets[index] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def render(self):
+        """Возвращает метрики в текстовом формате Prometheus."""
+        with self.lock:
+            hits = sum(self.values['cache_hits_total'].values())
+            misses = sum(self.values['cache_misses_total'].values())
+            if hits + misses:
+                self.values['cache_hit_ratio'][()] = hits / (hits + misses)
+            lines = []
+            for name, (metric_type, help_text) in METRICS.items():
+                if not self.values.get(name):
+                    continue
+                full_name = f'{METRICS_PREFIX}_{name}'
+                lines.append(f'# HELP {full_name} {help_text}')
+                lines.append(f'# TYPE {full_name} {metric_type}')
+                for key, value in sorted(self.values[name].items()):
+                    if metric_type == 'histogram':
+                        lines.extend(
+                            self.render_histogram(full_name, key, value)
+                        )
+                    else:
+                        lines.append(
+                            f'{full_name}{format_labels(key)} {value}'
+                        )
+        return '\n'.join(lines) + '\n'
+
+    def render_histogram(self, full_name, key, histogram):
+        buckets, total, count = histogram
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+        for bound, bucket in zip(bounds, buckets + [count]):
+            labels = format_labels(key + (('le', bound),))
+            yield f'{full_name}_bucket{labels} {bucket}'
+        yield f'{full_name}_sum{format_labels(key)} {total}'
+        yield f'{full_name}_count{format_labels(key)} {count}'
+
+
+def format_labels(key):
+    """Возвращает метки метрики в формате Prometheus."""
+    if not key:
+        return ''
+    labels = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n')
+        )
+        for name, value in key
+    )
+    return f'{{{labels}}}'
+
+
+def increment(name, value=1, **labels):
+    if registry is not None:
+        registry.increment(name, value, **labels)
+
+
+def count_error(exc):
+    """Учитывает исключение в метриках один раз."""
+    if registry is None or getattr(exc, 'metrics_counted', False):
+        return
+    exc.metrics_counted = True
+    registry.increment('errors_total', exception=type(exc).__name__)
+
+
+def observed_response(func):
+    """Декоратор загрузки: время загрузки и попадания в кеш."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if registry is None:
+            return func(*args, **kwargs)
+        started = time.perf_counter()
+        response = func(*args, **kwargs)
+        observe_response(
+            time.perf_counter() - started,
+            getattr(response, 'from_cache', False)
+        )
+        return response
+    return wrapper
+
+
+def observe_response(elapsed, from_cache):
+    if registry is None:
+        return
+    source = 'cache' if from_cache else 'network'
+    registry.observe('request_duration_seconds', elapsed, source=source)
+    registry.increment(
+        'cache_hits_total' if from_cache else 'cache_misses_total'
+    )
+
+
+class ErrorCountingHandler(logging.Handler):
+    """Обработчик логов, считающий залогированные исключения."""
+
+    def emit(self, record):
+        if record.exc_info and record.exc_info[1] is not None:
+            count_error(record.exc_info[1])
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = registry.render().encode('utf-8')
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port, host='127.0.0.1'):
+    """Запускает в фоновом потоке HTTP сервер с метриками на /metrics."""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    logging.info(
+        f'Метрики доступны по адресу: '
+        f'http://{host}:{server.server_port}/metrics'
+    )
+    return server
+
+
+def write_metrics(file_path):
+    """Сохраняет метрики в файл для textfile коллектора node_exporter.
+
+    Режимы, запущенные параллельно, записывают файл по очереди.
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = file_path.with_name(f'{file_path.name}.tmp')
+    with write_lock:
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write(registry.render())
+        tmp_path.replace(file_path)
+    logging.info(f'Метрики были сохранены: {file_path}')
+
+
+@contextmanager
+def collect_metrics(cli_args):
+    """Включает сбор метрик и отдает их по HTTP, если задан порт."""
+    global registry
+    metrics_file = getattr(cli_args, 'metrics_file', None)
+    metrics_port = getattr(cli_args, 'metrics_port', None)
+    if metrics_file is None and metrics_port is None:
+        yield
+        return
+    registry = MetricsRegistry()
+    handler = ErrorCountingHandler()
+    logging.getLogger().addHandler(handler)
+    server = (
+        start_metrics_server(metrics_port)
+        if metrics_port is not None else None
+    )
+    try:
+        yield
+    finally:
+        logging.getLogger().removeHandler(handler)
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        registry = None
+
+
+@contextmanager
+def track_run(cli_args):
+    """Учитывает длительность и успешность запуска и сохраняет метрики."""
+    if registry is None:
+        yield
+        return
+    started = time.perf_counter()
+    success = False
+    try:
+        yield
+        success = True
+    except Exception as exc:
+        count_error(exc)
+        raise
+    finally:
+        mode = getattr(cli_args, 'mode', '')
+        registry.set(
+            'run_duration_seconds', time.perf_counter() - started, mode=mode
+        )
+        registry.set('last_run_success', int(success), mode=mode)
+        registry.set('last_run_timestamp_seconds', time.time(), mode=mode)
+        metrics_file = getattr(cli_args, 'metrics_file', None)
+        if metrics_file is not None:
+            write_metrics(metrics_file)
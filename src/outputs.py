@@ -1,51 +1,146 @@
 import csv
 import datetime as dt
+import json
 import logging
+from contextlib import contextmanager
+from itertools import islice
 
-from prettytable import PrettyTable
-
-from constants import BASE_DIR, DATETIME_FORMAT
+from constants import BASE_DIR, DATETIME_FORMAT, OUTPUT_BATCH_SIZE
+from timings import timed_consumer
 
 
 def default_output(results, *args):
     """Дефолтный вывод в консоль."""
-    print(
-        '\n'.join(
-            ' '.join(value) for value in results
-        )
-    )
+    for value in results:
+        print(' '.join(map(str, value)))
 
 
 def pretty_output(results, *args):
     """Вывод результата в виде таблицы."""
+    from prettytable import PrettyTable
+    rows = iter(results)
     table = PrettyTable()
-    table.field_names = results[0]
+    table.field_names = next(rows)
     table.align = 'l'
-    table.add_rows(results[1:])
+    table.add_rows(list(rows))
     print(table)
 
 
-def file_output(results, cli_args):
-    """Запись результатов в файл."""
+def result_file_path(cli_args, extension):
+    """Возвращает путь к файлу результатов режима."""
     results_dir = BASE_DIR / 'results'
     results_dir.mkdir(exist_ok=True)
     parser_mode = cli_args.mode
     now = dt.datetime.now()
     now_formatted = now.strftime(DATETIME_FORMAT)
-    file_name = f'{parser_mode}_{now_formatted}.csv'
-    file_path = results_dir / file_name
-    with open(file_path, 'w', encoding='utf-8') as f:
+    file_name = f'{parser_mode}_{now_formatted}.{extension}'
+    return results_dir / file_name
+
+
+@contextmanager
+def removed_on_error(file_path):
+    """Удаляет недописанный файл результатов, если запись прервалась."""
+    try:
+        yield file_path
+    except BaseException:
+        file_path.unlink(missing_ok=True)
+        raise
+
+
+def file_output(results, cli_args):
+    """Запись результатов в файл."""
+    rows = iter(results)
+    header = next(rows, None)
+    if header is None:
+        logging.warning('Нет результатов для записи в файл.')
+        return
+    file_path = result_file_path(cli_args, 'csv')
+    with (
+        removed_on_error(file_path),
+        open(file_path, 'w', encoding='utf-8') as f
+    ):
         writer = csv.writer(f, dialect='unix')
-        writer.writerows(results)
+        writer.writerow(header)
+        writer.writerows(rows)
     logging.info(f'Файл с результатами был сохранён: {file_path}')
 
 
+def jsonl_output(results, cli_args):
+    """Запись результатов в файл JSON Lines по мере их получения."""
+    rows = iter(results)
+    header = next(rows, None)
+    if header is None:
+        logging.warning('Нет результатов для записи в файл.')
+        return
+    file_path = result_file_path(cli_args, 'jsonl')
+    with (
+        removed_on_error(file_path),
+        open(file_path, 'w', encoding='utf-8') as f
+    ):
+        for row in rows:
+            f.write(json.dumps(dict(zip(header, row)), ensure_ascii=False))
+            f.write('\n')
+    logging.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+def record_batches(results, batch_size):
+    """Возвращает результаты пачками RecordBatch со схемой первой пачки."""
+    import pyarrow
+    rows = iter(results)
+    header = next(rows, None)
+    schema = None
+    while batch := list(islice(rows, batch_size)):
+        record_batch = pyarrow.record_batch(
+            [list(column) for column in zip(*batch)],
+            names=None if schema else list(header),
+            schema=schema
+        )
+        schema = record_batch.schema
+        yield record_batch
+
+
+def write_record_batches(results, cli_args, extension, open_writer):
+    """Запись результатов пачками в файл формата Arrow."""
+    batches = record_batches(results, OUTPUT_BATCH_SIZE)
+    first_batch = next(batches, None)
+    if first_batch is None:
+        logging.warning('Нет результатов для записи в файл.')
+        return
+    file_path = result_file_path(cli_args, extension)
+    with (
+        removed_on_error(file_path),
+        open_writer(str(file_path), first_batch.schema) as writer
+    ):
+        writer.write_batch(first_batch)
+        for batch in batches:
+            writer.write_batch(batch)
+    logging.info(f'Файл с результатами был сохранён: {file_path}')
+
+
+def arrow_output(results, cli_args):
+    """Запись результатов в файл Arrow IPC по мере их получения."""
+    import pyarrow.ipc
+    write_record_batches(results, cli_args, 'arrow', pyarrow.ipc.new_file)
+
+
+def parquet_output(results, cli_args):
+    """Запись результатов в файл Parquet по мере их получения."""
+    import pyarrow.parquet
+    write_record_batches(
+        results, cli_args, 'parquet', pyarrow.parquet.ParquetWriter
+    )
+
+
 OUTPUT_TO_FUNCTION = {
     'pretty': pretty_output,
     'file': file_output,
+    'jsonl': jsonl_output,
+    'arrow': arrow_output,
+    'parquet': parquet_output,
     'console': default_output,
 }
 
 
+@timed_consumer('output')
 def control_output(results, cli_args):
     OUTPUT_TO_FUNCTION.get(cli_args.output, default_output)(results, cli_args)
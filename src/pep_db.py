@@ -0,0 +1,123 @@
+import logging
+import sqlite3
+from contextlib import closing
+
+from constants import (EXPECTED_STATUS, TABLE_FOOTER_STATUS_TOTAL,
+                       TABLE_HEADER_CHANGES, TABLE_HEADER_MISMATCHES,
+                       TABLE_HEADER_STATUS_COUNT)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS peps (
+    number INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    status_key TEXT,
+    status TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    fetched_at TEXT,
+    content_hash TEXT,
+    mismatch INTEGER NOT NULL DEFAULT 0,
+    changed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS peps_status ON peps (status);
+CREATE INDEX IF NOT EXISTS peps_changed_at ON peps (changed_at);
+CREATE INDEX IF NOT EXISTS peps_mismatch ON peps (number) WHERE mismatch;
+'''
+
+UPSERT = '''
+INSERT INTO peps (
+    number, url, status_key, status, title,
+    fetched_at, content_hash, mismatch, changed_at
+)
+VALUES (
+    :number, :url, :status_key, :status, :title,
+    :fetched_at, :content_hash, :mismatch, :fetched_at
+)
+ON CONFLICT (number) DO UPDATE SET
+    url = excluded.url,
+    status_key = excluded.status_key,
+    status = excluded.status,
+    title = excluded.title,
+    fetched_at = excluded.fetched_at,
+    content_hash = excluded.content_hash,
+    mismatch = excluded.mismatch,
+    changed_at = CASE
+        WHEN peps.status IS NOT excluded.status
+            OR peps.status_key IS NOT excluded.status_key
+            OR peps.content_hash IS NOT excluded.content_hash
+        THEN excluded.fetched_at
+        ELSE peps.changed_at
+    END
+'''
+
+
+def connect_pep_db(file_path):
+    """Возвращает соединение с базой PEP, создавая таблицу и индексы."""
+    db = sqlite3.connect(file_path)
+    db.executescript(SCHEMA)
+    return db
+
+
+def pep_db_row(pep_url, pep_entry):
+    """Возвращает строку базы PEP по записи снимка запуска."""
+    status_key = pep_entry.get('status_key')
+    return {
+        'number': int(pep_entry['number']),
+        'url': pep_url,
+        'status_key': status_key,
+        'status': pep_entry['status'],
+        'title': pep_entry.get('title', ''),
+        'fetched_at': pep_entry.get('fetched_at'),
+        'content_hash': pep_entry.get('content_hash'),
+        'mismatch': (
+            status_key is not None
+            and pep_entry['status'] not in EXPECTED_STATUS.get(status_key, ())
+        ),
+    }
+
+
+def save_peps(file_path, peps):
+    """Добавляет или обновляет PEP в базе одной транзакцией."""
+    with closing(connect_pep_db(file_path)) as db, db:
+        db.executemany(UPSERT, (
+            pep_db_row(pep_url, pep_entry)
+            for pep_url, pep_entry in peps.items()
+        ))
+    logging.info(f'База PEP была обновлена: {file_path}')
+
+
+def status_count_report(db, cli_args=None):
+    """Количество PEP в каждом статусе."""
+    yield TABLE_HEADER_STATUS_COUNT
+    total = 0
+    for status, count in db.execute(
+        'SELECT status, COUNT(*) FROM peps GROUP BY status ORDER BY status'
+    ):
+        total += count
+        yield status, count
+    yield TABLE_FOOTER_STATUS_TOTAL, total
+
+
+def mismatches_report(db, cli_args=None):
+    """PEP, статус которых в карточке не совпадает со статусом в индексе."""
+    yield TABLE_HEADER_MISMATCHES
+    yield from db.execute(
+        'SELECT number, url, status_key, status FROM peps '
+        'WHERE mismatch ORDER BY number'
+    )
+
+
+def changes_report(db, cli_args=None):
+    """PEP, изменившиеся с даты из параметра --since."""
+    yield TABLE_HEADER_CHANGES
+    yield from db.execute(
+        'SELECT number, url, status, changed_at FROM peps '
+        'WHERE changed_at >= ? ORDER BY changed_at, number',
+        (getattr(cli_args, 'since', None) or '',)
+    )
+
+
+REPORT_TO_FUNCTION = {
+    'status-count': status_count_report,
+    'mismatches': mismatches_report,
+    'changes': changes_report,
+}
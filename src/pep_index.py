@@ -0,0 +1,87 @@
+import sys
+from collections import Counter, defaultdict, namedtuple
+
+from constants import PEP_CARD_FIELDS, PEP_INDEX_FIELDS, PEP_LIST_FIELDS
+
+PEPRecord = namedtuple(
+    'PEPRecord',
+    ('number', 'url', 'title', *PEP_CARD_FIELDS.values()),
+    defaults=('',) + tuple(
+        () if field in PEP_LIST_FIELDS else ''
+        for field in PEP_CARD_FIELDS.values()
+    )
+)
+
+
+def card_fields(title, header):
+    """Возвращает поля карточки PEP из заголовка и пар (поле, текст)."""
+    fields = {'title': title.strip()}
+    for name, text in header:
+        field = PEP_CARD_FIELDS.get(name.strip().rstrip(':'))
+        if field is None:
+            continue
+        text = ' '.join(text.split())
+        fields[field] = (
+            [value.strip() for value in text.split(',') if value.strip()]
+            if field in PEP_LIST_FIELDS else text
+        )
+    return fields
+
+
+def make_record(number, url, fields):
+    """Возвращает запись PEP с общими строками для повторяющихся значений."""
+    return PEPRecord(number, url, **{
+        field: (
+            tuple(map(sys.intern, value))
+            if field in PEP_LIST_FIELDS else sys.intern(value)
+        )
+        for field, value in fields.items()
+    })
+
+
+class PEPIndex:
+    """Записи PEP по номеру и вторичные индексы по полям PEP_INDEX_FIELDS."""
+
+    def __init__(self, records=()):
+        self.records = {}
+        self.indexes = {
+            field: defaultdict(set) for field in PEP_INDEX_FIELDS.values()
+        }
+        for record in records:
+            self.add(record)
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, record):
+        old_record = self.records.get(record.number)
+        if old_record is not None:
+            for field, index in self.indexes.items():
+                for value in index_values(old_record, field):
+                    index[value].discard(old_record.number)
+        self.records[record.number] = record
+        for field, index in self.indexes.items():
+            for value in index_values(record, field):
+                index[value].add(record.number)
+
+    def find(self, *criteria):
+        """Возвращает записи, у которых поля содержат заданные значения.
+
+        criteria - пары (поле, значение), все условия должны выполняться.
+        """
+        numbers = set(self.records)
+        for field, value in criteria:
+            numbers &= self.indexes[field].get(value, set())
+        return [self.records[number] for number in sorted(numbers, key=int)]
+
+    def count_by(self, field):
+        """Возвращает количество записей по значениям индексируемого поля."""
+        return Counter({
+            value: len(numbers)
+            for value, numbers in self.indexes[field].items() if numbers
+        })
+
+
+def index_values(record, field):
+    value = getattr(record, field)
+    return value if field in PEP_LIST_FIELDS else (value,)
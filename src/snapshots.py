@@ -0,0 +1,24 @@
+import json
+import logging
+
+
+def load_snapshot(file_path):
+    """Возвращает сохраненный снимок предыдущего запуска."""
+    try:
+        with open(file_path, encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        logging.exception(f'Снимок повреждён и будет пересоздан: {file_path}')
+        return {}
+
+
+def save_snapshot(file_path, snapshot):
+    """Сохраняет снимок запуска."""
+    file_path.parent.mkdir(exist_ok=True)
+    tmp_path = file_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(snapshot, file, ensure_ascii=False)
+    tmp_path.replace(file_path)
+    logging.info(f'Снимок был сохранён: {file_path}')
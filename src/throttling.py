@@ -0,0 +1,196 @@
+import logging
+import random
+import socket
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import Timeout
+from urllib3.connection import HTTPConnection
+
+from constants import (BACKOFF_BASE, BACKOFF_MAX, DEFAULT_RATE,
+                       DEFAULT_RETRIES, DEFAULT_TIMEOUT, RETRY_AFTER_MAX,
+                       RETRY_STATUSES, THROTTLE_STATUSES)
+from metrics import increment
+
+
+class TokenBucket:
+    """Ограничение частоты запросов к хосту с адаптивной скоростью.
+
+    Скорость уменьшается вдвое при ответах 429 и 503 и постепенно
+    восстанавливается до заданной при успешных ответах.
+    """
+
+    def __init__(self, rate):
+        self.max_rate = self.rate = rate
+        self.capacity = max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = Lock()
+
+    def reserve(self):
+        """Забирает токен и возвращает время ожидания его появления."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            return -self.tokens / self.rate if self.tokens < 0 else 0
+
+    def acquire(self):
+        """Ждет, пока в корзине появится токен, и забирает его."""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """Асинхронно ждет, пока в корзине появится токен."""
+        import asyncio
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def slow_down(self):
+        with self.lock:
+            self.rate = max(self.rate / 2, self.max_rate / 16)
+
+    def speed_up(self):
+        with self.lock:
+            self.rate = min(self.rate + self.max_rate / 16, self.max_rate)
+
+    def adjust(self, status_code):
+        """Меняет скорость запросов по коду ответа."""
+        if status_code in THROTTLE_STATUSES:
+            self.slow_down()
+        elif status_code < 400:
+            self.speed_up()
+
+
+def backoff_delay(attempt):
+    """Экспоненциальная задержка перед повтором со случайным разбросом."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def retry_after_delay(response):
+    """Возвращает задержку из заголовка Retry-After в секундах или None."""
+    retry_after = response.headers.get('Retry-After')
+    if retry_after is None:
+        return None
+    try:
+        delay = float(retry_after)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(delay, 0), RETRY_AFTER_MAX)
+
+
+def response_retry_delay(response, attempt):
+    """Задержка перед повтором по Retry-After или экспоненциальная."""
+    delay = retry_after_delay(response)
+    return backoff_delay(attempt) if delay is None else delay
+
+
+def keepalive_socket_options(idle):
+    """Параметры сокета для TCP keep-alive после idle секунд простоя."""
+    options = [
+        *HTTPConnection.default_socket_options,
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+    if hasattr(socket, 'TCP_KEEPIDLE'):
+        options += [
+            (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle),
+            (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, idle),
+        ]
+    return options
+
+
+class SchedulingAdapter(HTTPAdapter):
+    """Транспорт с ограничением частоты запросов к хосту и повторами.
+
+    Ответы из кеша requests_cache не проходят через транспорт
+    и не расходуют токены.
+    """
+
+    def __init__(
+        self,
+        rate=DEFAULT_RATE,
+        retries=DEFAULT_RETRIES,
+        timeout=DEFAULT_TIMEOUT,
+        keepalive=None,
+        **kwargs
+    ):
+        self.keepalive = keepalive
+        super().__init__(**kwargs)
+        self.rate = rate
+        self.retries = retries
+        self.timeout = timeout
+        self.buckets = defaultdict(lambda: TokenBucket(self.rate))
+        self.buckets_lock = Lock()
+        self.retried = 0
+        self.timed_out = 0
+
+    def init_poolmanager(self, *args, **kwargs):
+        keepalive = getattr(self, 'keepalive', None)
+        if keepalive is not None:
+            kwargs['socket_options'] = keepalive_socket_options(keepalive)
+        super().init_poolmanager(*args, **kwargs)
+
+    def get_bucket(self, url):
+        with self.buckets_lock:
+            return self.buckets[urlsplit(url).netloc]
+
+    def send(self, request, timeout=None, **kwargs):
+        bucket = self.get_bucket(request.url)
+        timeout = self.timeout if timeout is None else timeout
+        attempt = 0
+        while True:
+            bucket.acquire()
+            try:
+                response = self.transmit(request, timeout=timeout, **kwargs)
+            except (Timeout, RequestsConnectionError) as exc:
+                if isinstance(exc, Timeout):
+                    self.count('timed_out')
+                    increment('request_timeouts_total')
+                if attempt >= self.retries:
+                    raise
+                reason, delay = type(exc).__name__, backoff_delay(attempt)
+            else:
+                bucket.adjust(response.status_code)
+                if (
+                    response.status_code not in RETRY_STATUSES
+                    or attempt >= self.retries
+                ):
+                    return response
+                reason = str(response.status_code)
+                delay = response_retry_delay(response, attempt)
+                response.close()
+            attempt += 1
+            self.log_retry(request.url, attempt, reason, delay)
+            time.sleep(delay)
+
+    def log_retry(self, url, attempt, reason, delay):
+        """Учитывает повтор запроса в счетчиках и пишет его в лог."""
+        self.count('retried')
+        increment('request_retries_total', reason=reason)
+        logging.warning(
+            f'Повтор {attempt} из {self.retries} запроса {url} '
+            f'через {delay:.1f} с. Причина: {reason}'
+        )
+
+    def transmit(self, request, **kwargs):
+        """Отправляет запрос без ограничения частоты и повторов."""
+        return super().send(request, **kwargs)
+
+    def count(self, counter):
+        with self.buckets_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
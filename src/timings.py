@@ -0,0 +1,160 @@
+import json
+import logging
+import math
+from collections import defaultdict
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+
+profiler = None
+
+
+class Profiler:
+    """Время по фазам работы парсера, объем загруженных данных и кеш."""
+
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.bytes_fetched = 0
+        self.cache_hits = 0
+        self.lock = Lock()
+
+    def add(self, phase, elapsed):
+        with self.lock:
+            self.timings[phase].append(elapsed)
+
+    def add_response(self, elapsed, size, from_cache):
+        self.add('cache' if from_cache else 'network', elapsed)
+        with self.lock:
+            self.bytes_fetched += size
+            self.cache_hits += from_cache
+
+    def report(self):
+        """Возвращает сводку по фазам: вызовы, сумма и перцентили в мс."""
+        phases = {}
+        for phase, timings in sorted(self.timings.items()):
+            timings = sorted(timings)
+            phases[phase] = {
+                'calls': len(timings),
+                'total': sum(timings) * 1000,
+                'p50': percentile(timings, 50) * 1000,
+                'p90': percentile(timings, 90) * 1000,
+                'p99': percentile(timings, 99) * 1000,
+                'max': timings[-1] * 1000,
+            }
+        return {
+            'phases': phases,
+            'bytes_fetched': self.bytes_fetched,
+            'cache_hits': self.cache_hits,
+        }
+
+
+def percentile(sorted_values, percent):
+    """Перцентиль отсортированного списка методом ближайшего ранга."""
+    rank = max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def enable_profiling():
+    global profiler
+    profiler = Profiler()
+    return profiler
+
+
+def disable_profiling():
+    global profiler
+    profiler = None
+
+
+def timed(phase):
+    """Декоратор, учитывающий время вызова функции в фазе phase.
+
+    Пока профилирование выключено, функция вызывается напрямую.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if profiler is None:
+                return func(*args, **kwargs)
+            started = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.add(phase, perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def timed_consumer(phase):
+    """Декоратор потребителя строк: учитывает в фазе phase время вызова
+    без времени, потраченного генератором на выдачу строк.
+
+    Декорируемая функция принимает итерируемый объект первым аргументом.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(rows, *args, **kwargs):
+            if profiler is None:
+                return func(rows, *args, **kwargs)
+            producing = 0.0
+
+            def timed_rows():
+                nonlocal producing
+                iterator = iter(rows)
+                while True:
+                    started = perf_counter()
+                    try:
+                        row = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        producing += perf_counter() - started
+                    yield row
+
+            started = perf_counter()
+            try:
+                return func(timed_rows(), *args, **kwargs)
+            finally:
+                profiler.add(phase, perf_counter() - started - producing)
+        return wrapper
+    return decorator
+
+
+def timed_response(func):
+    """Декоратор загрузки: время в фазе cache или network и объем данных."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if profiler is None:
+            return func(*args, **kwargs)
+        started = perf_counter()
+        response = func(*args, **kwargs)
+        profiler.add_response(
+            perf_counter() - started,
+            len(response.content) if not kwargs.get('stream') else 0,
+            getattr(response, 'from_cache', False)
+        )
+        return response
+    return wrapper
+
+
+def print_profile(file_path=None):
+    """Печатает сводку профилирования и сохраняет ее в JSON файл."""
+    report = profiler.report()
+    lines = [
+        f'{"Фаза":<10}{"Вызовы":>8}{"Всего, мс":>12}{"p50":>9}'
+        f'{"p90":>9}{"p99":>9}{"max":>9}'
+    ]
+    for phase, stats in report['phases'].items():
+        lines.append(
+            f'{phase:<10}{stats["calls"]:>8}{stats["total"]:>12.1f}'
+            f'{stats["p50"]:>9.2f}{stats["p90"]:>9.2f}{stats["p99"]:>9.2f}'
+            f'{stats["max"]:>9.2f}'
+        )
+    lines.append(
+        f'Загружено байт: {report["bytes_fetched"]}, '
+        f'ответов из кеша: {report["cache_hits"]}'
+    )
+    print('\n'.join(lines))
+    if file_path is not None:
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        logging.info(f'Профиль был сохранён: {file_path}')
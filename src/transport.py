@@ -0,0 +1,82 @@
+from io import BytesIO
+
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import ConnectTimeout, ReadTimeout
+from urllib3 import HTTPResponse
+
+from constants import HTTP2_KEEPALIVE_EXPIRY
+from throttling import SchedulingAdapter, keepalive_socket_options
+
+
+def httpx_timeout(timeout):
+    """Переводит таймаут requests в таймаут httpx."""
+    import httpx
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+class HTTP2Adapter(SchedulingAdapter):
+    """Транспорт на httpx, мультиплексирующий запросы к хосту по HTTP/2.
+
+    Потоковые запросы (загрузка архивов) идут через пул соединений
+    HTTP/1.1 requests. Ограничение частоты и повторы общие, сертификаты
+    проверяет httpx. Простаивающие соединения закрываются через
+    HTTP2_KEEPALIVE_EXPIRY секунд, keepalive включает TCP keep-alive.
+    """
+
+    def init_poolmanager(self, connections, maxsize, *args, **kwargs):
+        import httpx
+        super().init_poolmanager(connections, maxsize, *args, **kwargs)
+        keepalive = getattr(self, 'keepalive', None)
+        self.client = httpx.Client(transport=httpx.HTTPTransport(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=maxsize,
+                max_keepalive_connections=maxsize,
+                keepalive_expiry=HTTP2_KEEPALIVE_EXPIRY
+            ),
+            socket_options=(
+                keepalive_socket_options(keepalive)
+                if keepalive is not None else None
+            )
+        ))
+
+    def transmit(self, request, stream=False, timeout=None, **kwargs):
+        if stream:
+            return super().transmit(
+                request, stream=stream, timeout=timeout, **kwargs
+            )
+        import httpx
+        try:
+            response = self.client.request(
+                request.method,
+                request.url,
+                headers=request.headers,
+                content=request.body,
+                timeout=httpx_timeout(timeout)
+            )
+        except httpx.ConnectTimeout as exc:
+            raise ConnectTimeout(exc, request=request) from exc
+        except httpx.TimeoutException as exc:
+            raise ReadTimeout(exc, request=request) from exc
+        except httpx.TransportError as exc:
+            raise RequestsConnectionError(exc, request=request) from exc
+        raw = HTTPResponse(
+            body=BytesIO(),
+            headers=response.headers.multi_items(),
+            status=response.status_code,
+            version=20 if response.http_version == 'HTTP/2' else 11,
+            reason=response.reason_phrase,
+            preload_content=False,
+            decode_content=False,
+            request_url=request.url
+        )
+        result = self.build_response(request, raw)
+        result._content = response.content
+        return result
+
+    def close(self):
+        super().close()
+        self.client.close()
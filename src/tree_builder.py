@@ -0,0 +1,42 @@
+from bs4.builder import LXMLTreeBuilder
+
+
+class CompactTreeBuilder(LXMLTreeBuilder):
+    """Построитель дерева lxml без переводов строк и пустых текстовых узлов."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.text_parts = []
+
+    def flush_text(self):
+        text = ''.join(self.text_parts).replace('\n', '')
+        self.text_parts.clear()
+        if text.strip():
+            super().data(text)
+
+    def data(self, content):
+        self.text_parts.append(content)
+
+    def start(self, *args, **kwargs):
+        self.flush_text()
+        super().start(*args, **kwargs)
+
+    def end(self, *args, **kwargs):
+        self.flush_text()
+        super().end(*args, **kwargs)
+
+    def comment(self, *args, **kwargs):
+        self.flush_text()
+        super().comment(*args, **kwargs)
+
+    def pi(self, *args, **kwargs):
+        self.flush_text()
+        super().pi(*args, **kwargs)
+
+    def doctype(self, *args, **kwargs):
+        self.flush_text()
+        super().doctype(*args, **kwargs)
+
+    def close(self):
+        self.flush_text()
+        super().close()
@@ -1,16 +1,38 @@
+import hashlib
 import logging
-import re
+import string
+from concurrent.futures import (Future, ProcessPoolExecutor,
+                                ThreadPoolExecutor, as_completed)
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, partial
+from http import HTTPStatus
+from multiprocessing import get_context
+from threading import BoundedSemaphore
+from urllib.parse import urlsplit
 
-from bs4 import BeautifulSoup
-from requests import RequestException
+from requests import RequestException, Session
+from requests.exceptions import ChunkedEncodingError
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import HTTPError
 
-from exceptions import DOMQueryingException, ParserFindTagException
+from constants import (DEFAULT_ENGINE, DEFAULT_PARSER, DEFAULT_WORKERS,
+                       DOWNLOAD_ATTEMPTS, DOWNLOAD_CHUNK_SIZE,
+                       PARSE_BATCH_SIZE)
+from exceptions import (DOMQueryingException, DownloadSizeException,
+                        ParserFindTagException)
+from failures import current_page, page_context, report_failure
+from metrics import increment, observed_response
+from timings import timed, timed_response
 
 
-def get_response(session, url):
+@observed_response
+@timed_response
+def get_response(session, url, method='GET', **kwargs):
     """Загрузка данных ресурса по url."""
     try:
-        response = session.get(url)
+        response = session.request(method, url, **kwargs)
+        if hasattr(session, 'cache_stats'):
+            session.cache_stats.count(response)
         response.raise_for_status()
         return response
     except RequestException:
@@ -21,33 +43,380 @@ def get_response(session, url):
         raise
 
 
-def download_file(session, url, file_path):
-    """Загрузка файла по url."""
-    response = get_response(session, url)
-    with open(file_path, 'wb') as file:
-        file.write(response.content)
+def uncached_session(session):
+    """Возвращает сессию без кеша с заголовками и транспортом сессии."""
+    uncached = Session()
+    uncached.headers.update(session.headers)
+    for prefix, adapter in session.adapters.items():
+        uncached.mount(prefix, adapter)
+    return uncached
+
+
+def download_part(session, url, part_path, chunk_size):
+    """Докачивает файл в `.part` и возвращает ожидаемый размер файла.
+
+    Файл запрашивается без сжатия (Accept-Encoding: identity), чтобы
+    смещение Range и Content-Length считались в сохраняемых байтах.
+    """
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    headers = {'Accept-Encoding': 'identity'}
+    if offset:
+        headers['Range'] = f'bytes={offset}-'
+    try:
+        response = get_response(session, url, headers=headers, stream=True)
+    except HTTPError as exc:
+        if offset and exc.response.status_code == (
+            HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+        ):
+            part_path.unlink()
+            return download_part(session, url, part_path, chunk_size)
+        raise
+    with response:
+        if response.status_code != HTTPStatus.PARTIAL_CONTENT:
+            offset = 0
+        content_length = response.headers.get('Content-Length')
+        with open(part_path, 'ab' if offset else 'wb') as file:
+            for chunk in response.iter_content(chunk_size):
+                file.write(chunk)
+    return offset + int(content_length) if content_length else None
+
+
+def download_file(
+    session,
+    url,
+    file_path,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    attempts=DOWNLOAD_ATTEMPTS
+):
+    """Потоковая загрузка файла по url с докачкой после обрыва связи."""
+    part_path = file_path.with_name(f'{file_path.name}.part')
+    for attempt in range(1, attempts + 1):
+        try:
+            expected_size = download_part(
+                session, url, part_path, chunk_size
+            )
+            break
+        except (ChunkedEncodingError, RequestsConnectionError):
+            if attempt == attempts:
+                raise
+            logging.warning(
+                f'Загрузка файла прервана, попытка {attempt} из {attempts}: '
+                f'{url}',
+                exc_info=True
+            )
+    size = part_path.stat().st_size
+    if expected_size is not None and size != expected_size:
+        error_msg = (
+            f'Размер загруженного файла {part_path} ({size} байт) '
+            f'не совпадает с ожидаемым ({expected_size} байт)'
+        )
+        logging.error(error_msg)
+        raise DownloadSizeException(error_msg)
+    part_path.replace(file_path)
     logging.info(f'Файл был загружен и сохранён: {file_path}')
 
 
-def get_soup_by_url(session, url):
-    """Возвращает объект BeautifulSoup для страницы по url."""
+def content_hash(content):
+    """Возвращает хеш содержимого страницы."""
+    return hashlib.sha1(content).hexdigest()
+
+
+def is_downloaded(session, url, file_path):
+    """Проверяет, что размер файла на диске совпадает с размером на сервере."""
+    if not file_path.exists():
+        return False
+    response = get_response(session, url, 'HEAD', allow_redirects=True)
+    content_length = response.headers.get('Content-Length')
+    return (
+        content_length is not None
+        and int(content_length) == file_path.stat().st_size
+    )
+
+
+def download_changed_file(session, url, file_path, host_semaphore):
+    """Загружает файл, если его нет на диске или он изменился."""
+    with host_semaphore:
+        if is_downloaded(session, url, file_path):
+            logging.info(f'Файл уже загружен: {file_path}')
+            return
+        download_file(session, url, file_path)
+
+
+def download_files(session, files, host_limit=DEFAULT_WORKERS):
+    """Параллельно загружает файлы с ограничением соединений на хост."""
+    session = uncached_session(session)
+    host_semaphores = {
+        urlsplit(url).netloc: BoundedSemaphore(host_limit) for url in files
+    }
+    with ThreadPoolExecutor(max_workers=max(len(files), 1)) as executor:
+        futures = {
+            executor.submit(
+                download_changed_file,
+                session,
+                url,
+                file_path,
+                host_semaphores[urlsplit(url).netloc]
+            ): url
+            for url, file_path in files.items()
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except (DownloadSizeException, RequestException):
+                logging.exception(
+                    f'Ошибка загрузки файла по адресу: {futures[future]}'
+                )
+
+
+@timed('parse')
+def make_soup(content):
+    """Возвращает объект BeautifulSoup для содержимого страницы.
+
+    Байты страницы передаются парсеру lxml частями, переводы строк
+    и пробельные узлы между тегами отбрасываются при построении дерева.
+    """
+    from bs4 import BeautifulSoup
+
+    from tree_builder import CompactTreeBuilder
+    return BeautifulSoup(
+        content, builder=CompactTreeBuilder(), from_encoding='utf-8'
+    )
+
+
+@timed('parse')
+def make_tree(content):
+    """Возвращает документ lxml.html для содержимого страницы."""
+    import lxml.html
+    return lxml.html.document_fromstring(
+        content, parser=lxml.html.HTMLParser(encoding='utf-8')
+    )
+
+
+PARSER_TO_FUNCTION = {
+    'bs4': make_soup,
+    'lxml': make_tree,
+}
+
+
+def get_soup_by_url(session, url, parser=DEFAULT_PARSER):
+    """Возвращает объект BeautifulSoup или документ lxml для страницы.
+
+    Страница остается текущей для сообщений об ошибках разбора в этом
+    потоке до загрузки следующей.
+    """
+    response = get_response(session, url)
+    current_page.set(
+        (url, content_hash(response.content), response.content)
+    )
+    return PARSER_TO_FUNCTION[parser](response.content)
+
+
+def extract_page(url, content, extract, parser=DEFAULT_PARSER, memo=None):
+    """Возвращает хеш содержимого страницы и извлеченные из нее данные.
+
+    Если данные для страницы с тем же хешем уже есть в memo,
+    страница не разбирается.
+    """
+    page_hash = content_hash(content)
+    if memo is not None:
+        data = memo.get(url, page_hash)
+        if data is not None:
+            return page_hash, data
+    with page_context(url, page_hash, content):
+        data = extract(PARSER_TO_FUNCTION[parser](content))
+    increment('pages_parsed_total', parser=parser)
+    if memo is not None:
+        memo.set(url, page_hash, data)
+    return page_hash, data
+
+
+def extract_by_url(session, url, extract, parser=DEFAULT_PARSER, memo=None):
+    """Загружает страницу по url и извлекает из нее данные."""
     response = get_response(session, url)
-    response.encoding = 'utf-8'
-    html = re.sub(r'>\s+<', '><', response.text.replace('\n', ''))
-    return BeautifulSoup(html, 'lxml')
+    return extract_page(url, response.content, extract, parser, memo)
 
 
+def extract_by_urls(
+    session,
+    urls,
+    extract,
+    workers=DEFAULT_WORKERS,
+    engine=DEFAULT_ENGINE,
+    parser=DEFAULT_PARSER,
+    memo=None
+):
+    """Загружает страницы и отдает пары (url, future) по мере готовности.
+
+    Результат future - хеш содержимого страницы и извлеченные данные.
+    """
+    if engine == 'async':
+        from async_utils import extract_by_urls as extract_by_urls_async
+        yield from extract_by_urls_async(
+            urls, extract, workers, parser, memo, session
+        )
+        return
+    if engine == 'process':
+        yield from extract_by_urls_in_processes(
+            session, urls, extract, workers, parser, memo
+        )
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                extract_by_url, session, url, extract, parser, memo
+            ): url
+            for url in urls
+        }
+        for future in as_completed(futures):
+            yield futures[future], future
+
+
+def extract_batch(pages, extract, parser):
+    """Разбирает пачку страниц в дочернем процессе.
+
+    Возвращает url, извлеченные данные и исключение для каждой страницы.
+    """
+    results = []
+    for url, page_hash, content in pages:
+        try:
+            with page_context(url, page_hash, content):
+                data = extract(PARSER_TO_FUNCTION[parser](content))
+            results.append((url, data, None))
+        except Exception as exc:
+            results.append((url, None, exc))
+    return results
+
+
+def completed_future(result=None, exception=None):
+    future = Future()
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+    return future
+
+
+def batch_results(batch_future, pages, parser, memo):
+    """Возвращает пары (url, future) по результатам разбора пачки страниц."""
+    try:
+        results = batch_future.result()
+    except Exception as exc:
+        if isinstance(exc, BrokenProcessPool):
+            process_pool.cache_clear()
+        for url, _, _ in pages:
+            yield url, completed_future(exception=exc)
+        return
+    for (url, page_hash, _), (_, data, exc) in zip(pages, results):
+        if exc is not None:
+            yield url, completed_future(exception=exc)
+            continue
+        increment('pages_parsed_total', parser=parser)
+        if memo is not None:
+            memo.set(url, page_hash, data)
+        yield url, completed_future((page_hash, data))
+
+
+def memoized_page(url, response_future, memo):
+    """Возвращает future с хешем и данными страницы или страницу для разбора.
+
+    Для ошибки загрузки и страницы из memo возвращается future, для новой
+    страницы - url, хеш и содержимое.
+    """
+    if response_future.exception() is not None:
+        return response_future, None
+    content = response_future.result().content
+    page_hash = content_hash(content)
+    data = memo.get(url, page_hash) if memo is not None else None
+    if data is not None:
+        return completed_future((page_hash, data)), None
+    return None, (url, page_hash, content)
+
+
+@lru_cache(maxsize=None)
+def process_pool():
+    """Возвращает пул процессов разбора страниц, общий для запусков режимов."""
+    return ProcessPoolExecutor(mp_context=get_context('spawn'))
+
+
+def extract_by_urls_in_processes(
+    session, urls, extract, workers, parser, memo
+):
+    """Загружает страницы в потоках и разбирает их пачками в процессах.
+
+    Новая пачка отправляется, когда она заполнена или процессы простаивают.
+    """
+    parsers = process_pool()
+    batches = {}
+    batch = []
+    with ThreadPoolExecutor(max_workers=workers) as downloads:
+        responses = {
+            downloads.submit(get_response, session, url): url for url in urls
+        }
+        for response_future in as_completed(responses):
+            url = responses[response_future]
+            future, page = memoized_page(url, response_future, memo)
+            if future is not None:
+                yield url, future
+                continue
+            batch.append(page)
+            if len(batch) == PARSE_BATCH_SIZE or not batches:
+                batches[parsers.submit(
+                    extract_batch, batch, extract, parser
+                )] = batch
+                batch = []
+            for done in [done for done in batches if done.done()]:
+                yield from batch_results(
+                    done, batches.pop(done), parser, memo
+                )
+        if batch:
+            batches[parsers.submit(extract_batch, batch, extract, parser)] = (
+                batch
+            )
+        for done in as_completed(batches):
+            yield from batch_results(done, batches[done], parser, memo)
+
+
+def progress(iterable, total=None, cli_args=None):
+    """Возвращает итератор с индикатором выполнения tqdm.
+
+    Индикаторы одновременно выполняемых режимов выводятся в своих строках.
+    """
+    from tqdm import tqdm
+    return tqdm(
+        iterable,
+        total=total,
+        desc=getattr(cli_args, 'mode', None),
+        position=getattr(cli_args, 'progress_position', None)
+    )
+
+
+def in_order(keys, results):
+    """Возвращает результаты в порядке ключей по мере их готовности.
+
+    results - пары (ключ, результат) в порядке готовности, результаты None
+    пропускаются.
+    """
+    keys = iter(keys)
+    next_key = next(keys, None)
+    ready = {}
+    for key, result in results:
+        ready[key] = result
+        while next_key in ready:
+            result = ready.pop(next_key)
+            if result is not None:
+                yield result
+            next_key = next(keys, None)
+
+
+@timed('select')
 def find_tag_all(soup, tag=None, *args, **kwargs):
     """Возвращает список элементов по тегу."""
     searched_tag = soup.find_all(tag, *args, **kwargs)
     if not searched_tag:
         attrs = kwargs.get('attrs', None)
-        error_msg = (
-            f'Не найден тег {tag} {attrs}\n'
-            f'Содержимое soup: {soup}'
-        )
-        logging.error(error_msg, stack_info=True)
-        raise ParserFindTagException(error_msg)
+        raise ParserFindTagException(report_failure(
+            f'Не найден тег {tag} {attrs}', soup.decode, content_hash
+        ))
     return searched_tag
 
 
@@ -57,16 +426,15 @@ def find_tag(soup, tag=None, *args, **kwargs):
     return tag_all[0] if tag_all else None
 
 
+@timed('select')
 def select_tag_all(soup, selector, namespaces=None, limit=None, **kwargs):
     """Возвращает список элементов по CSS селектору."""
     select_tag = soup.select(selector, namespaces, limit, **kwargs)
     if not select_tag:
-        error_msg = (
-            f'Не найдены теги по CSS селектору: {selector}\n'
-            f'Содержимое soup: {soup}'
-        )
-        logging.error(error_msg, stack_info=True)
-        raise DOMQueryingException(error_msg)
+        raise DOMQueryingException(report_failure(
+            f'Не найдены теги по CSS селектору: {selector}', soup.decode,
+            content_hash
+        ))
     return select_tag
 
 
@@ -74,3 +442,40 @@ def select_one_tag(soup, selector, namespaces=None, **kwargs):
     """"Возвращает первый элемент по выборке CSS селектора."""
     select_tag = select_tag_all(soup, selector, namespaces, 1, **kwargs)
     return select_tag[0] if select_tag else None
+
+
+@lru_cache(maxsize=None)
+def compile_xpath(expression):
+    """Возвращает скомпилированное XPath выражение."""
+    from lxml import etree
+    return etree.XPath(expression)
+
+
+@timed('select')
+def xpath_tag_all(tree, expression):
+    """Возвращает список элементов lxml по XPath выражению.
+
+    Как и `find_tag_all`, при отсутствии элементов выбрасывает
+    `ParserFindTagException`.
+    """
+    xpath_tag = compile_xpath(expression)(tree)
+    if not xpath_tag:
+        from lxml import etree
+        raise ParserFindTagException(report_failure(
+            f'Не найдены теги по XPath выражению: {expression}',
+            partial(etree.tostring, tree, encoding=str), content_hash
+        ))
+    return xpath_tag
+
+
+def xpath_one_tag(tree, expression):
+    """Возвращает первый элемент lxml по XPath выражению."""
+    return xpath_tag_all(tree, expression)[0]
+
+
+def element_text(element):
+    """Возвращает текст элемента lxml так же, как `make_soup`."""
+    return ''.join(
+        text.replace('\n', '') for text in element.itertext()
+        if text.strip(string.whitespace)
+    )
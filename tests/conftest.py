@@ -4,7 +4,9 @@ from pathlib import Path
 from bs4 import BeautifulSoup
 import requests_mock
 from argparse import Namespace
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 from requests_cache import CachedSession, ALL_METHODS
 from requests_mock import Adapter
@@ -110,3 +112,95 @@ def records():
         result = results[mode]
         return converting(result)
     return _records
+
+
+PEPS_URL = 'https://peps.python.org/'
+
+PEP_INDEX_ROW = (
+    '<tr><td><abbr title="{status}">S{key}</abbr></td>'
+    '<td><a class="pep reference internal" href="pep-{number:04d}/">'
+    '{number}</a></td></tr>'
+)
+
+PEP_CARD = (
+    '<html><body><section id="pep-content"><h1>PEP {number}</h1>\n'
+    '<dl>\n  <dt>Author:</dt>\n  <dd>Guido</dd>\n'
+    '  <dt>Status:</dt>\n  <dd><abbr>{status}</abbr></dd>\n'
+    '  <dt>Type:</dt>\n  <dd><abbr>Standards Track</abbr></dd>\n'
+    '</dl></section></body></html>'
+)
+
+PEP_SITE = [
+    (1, 'A', 'Active'),
+    (8, 'A', 'Accepted'),
+    (20, 'F', 'Final'),
+    (42, 'R', 'Rejected'),
+    (100, 'F', 'Rejected'),
+    (101, 'W', 'Withdrawn'),
+    (500, '', 'Draft'),
+]
+
+
+def pep_site_pages() -> Dict[str, str]:
+    rows = ''.join(
+        PEP_INDEX_ROW.format(number=number, key=key, status=status)
+        for number, key, status in PEP_SITE
+    )
+    pages = {
+        '': (
+            '<html><body><section id="numerical-index">\n<table>\n'
+            f'<tbody>\n{rows}\n</tbody></table></section></body></html>'
+        )
+    }
+    for number, _, status in PEP_SITE:
+        pages[f'pep-{number:04d}/'] = PEP_CARD.format(
+            number=number, status=status
+        )
+    return pages
+
+
+@pytest.fixture
+def pep_site():
+    """Мок сайта PEP с индексом и карточками."""
+    with requests_mock.Mocker() as mock:
+        for path, text in pep_site_pages().items():
+            mock.get(PEPS_URL + path, text=text)
+        yield mock
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    pages: Dict[str, str] = {}
+
+    def do_GET(self):
+        text = self.pages.get(self.path.lstrip('/'))
+        if text is None:
+            self.send_error(404)
+            return
+        body = text.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SiteServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+@pytest.fixture
+def local_pep_site():
+    """Локальный HTTP сервер с сайтом PEP, возвращает его адрес."""
+    handler = type('PEPSiteHandler', (SiteHandler,), {
+        'pages': pep_site_pages()
+    })
+    server = SiteServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/'
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,94 @@
+import time
+from argparse import Namespace
+
+import pytest
+import requests_mock
+
+from conftest import PEPS_URL
+try:
+    from src import cache, configs, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `cache.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `cache.py`'
+
+
+def cache_args(tmp_path, cache_backend='sqlite'):
+    return Namespace(
+        cache_backend=cache_backend,
+        cache_name=tmp_path / 'http_cache',
+        cache_url='redis://localhost:6379/0',
+        cache_max_bytes=None,
+        max_age=-1,
+        revalidate=False,
+        clear_cache=False
+    )
+
+
+@pytest.mark.parametrize('cache_backend', ['sqlite', 'filesystem'])
+def test_trim_cache(tmp_path, cache_backend):
+    session = configs.configure_session(cache_args(tmp_path, cache_backend))
+    with requests_mock.Mocker() as mock:
+        for number in range(3):
+            url = f'{PEPS_URL}pep-{number:04d}/'
+            mock.get(url, content=b'x' * 100)
+            utils.get_response(session, url)
+            time.sleep(0.01)
+    cache.trim_cache(session.cache, 250)
+    assert sorted(
+        response.url for response in session.cache.responses.values()
+    ) == [f'{PEPS_URL}pep-0001/', f'{PEPS_URL}pep-0002/'], (
+        'Функция `trim_cache` должна удалять самые старые ответы, '
+        'пока размер кеша превышает ограничение'
+    )
+
+
+@pytest.mark.parametrize('cache_backend', ['sqlite', 'filesystem'])
+def test_trim_cache_under_limit(tmp_path, monkeypatch, cache_backend):
+    session = configs.configure_session(cache_args(tmp_path, cache_backend))
+    with requests_mock.Mocker() as mock:
+        mock.get(PEPS_URL, content=b'x' * 100)
+        utils.get_response(session, PEPS_URL)
+
+    def values():
+        raise AssertionError
+
+    monkeypatch.setattr(session.cache.responses, 'values', values)
+    cache.trim_cache(session.cache, 10 ** 9)
+    assert session.cache.contains(url=PEPS_URL), (
+        'Функция `trim_cache` не должна читать ответы кеша, '
+        'если хранилище меньше ограничения'
+    )
+
+
+def test_redis_backend(tmp_path, monkeypatch):
+    fakeredis = pytest.importorskip('fakeredis')
+    redis = pytest.importorskip('redis')
+    monkeypatch.setattr(
+        redis.Redis, 'from_url', lambda url: fakeredis.FakeRedis()
+    )
+    session = configs.configure_session(cache_args(tmp_path, 'redis'))
+    with requests_mock.Mocker() as mock:
+        mock.get(PEPS_URL, text='PEP 0')
+        utils.get_response(session, PEPS_URL)
+        response = utils.get_response(session, PEPS_URL)
+    assert response.from_cache, (
+        'Повторный запрос должен обслуживаться из кеша redis'
+    )
+
+
+def test_cache_stats(tmp_path, caplog):
+    cli_args = cache_args(tmp_path)
+    session = configs.configure_session(cli_args)
+    with requests_mock.Mocker() as mock:
+        mock.get(PEPS_URL, text='PEP 0')
+        for _ in range(3):
+            utils.get_response(session, PEPS_URL)
+    assert (session.cache_stats.hits, session.cache_stats.misses) == (2, 1), (
+        'Сессия должна считать попадания и промахи кеша'
+    )
+    with caplog.at_level('INFO'):
+        cache.close_session(session, cli_args)
+    assert 'попаданий 2, промахов 1' in caplog.text, (
+        'При закрытии сессии в лог должна записываться статистика кеша'
+    )
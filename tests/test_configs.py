@@ -1,5 +1,6 @@
 import pytest
 import argparse
+import requests_mock
 try:
     from src import configs
 except ModuleNotFoundError:
@@ -29,7 +30,7 @@ def test_configs_file():
     ),
     (
         argparse._StoreAction, ['-o', '--output'], 'output',
-        ('pretty', 'file'),
+        ('pretty', 'file', 'jsonl', 'arrow', 'parquet'),
         'Дополнительные способы вывода данных'
     ),
 ])
@@ -64,3 +65,36 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+@pytest.mark.parametrize('cache_backend', ['sqlite', 'filesystem'])
+def test_configure_session_revalidate(tmp_path, cache_backend):
+    url = 'https://peps.python.org/pep-0008/'
+    conditional_headers = []
+
+    def pep_card(request, context):
+        conditional_headers.append(request.headers.get('If-None-Match'))
+        context.headers['ETag'] = '"pep-8"'
+        if request.headers.get('If-None-Match') == '"pep-8"':
+            context.status_code = 304
+            return ''
+        return 'PEP 8'
+
+    cli_args = argparse.Namespace(
+        cache_backend=cache_backend,
+        cache_name=tmp_path / 'http_cache',
+        max_age=0,
+        revalidate=True,
+        clear_cache=False
+    )
+    session = configs.configure_session(cli_args)
+    with requests_mock.Mocker() as mock:
+        mock.get(url, text=pep_card)
+        first = session.get(url)
+        second = session.get(url)
+    assert conditional_headers == [None, '"pep-8"'], (
+        'Повторный запрос должен отправлять заголовок `If-None-Match`'
+    )
+    assert second.from_cache and second.text == first.text == 'PEP 8', (
+        'Ответ 304 должен обновлять запись кеша без повторной загрузки'
+    )
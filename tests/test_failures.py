@@ -0,0 +1,127 @@
+import logging
+
+import pytest
+from bs4 import BeautifulSoup
+
+from conftest import PEP_INDEX_ROW
+
+try:
+    from src import main
+    import exceptions
+    import failures
+    import utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `failures.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `failures.py`'
+
+PAGE = (
+    '<html><body><p>' + 'PEP ' * 1000 + '</p></body></html>'
+).encode('utf-8')
+
+
+@pytest.fixture
+def failure_log(tmp_path):
+    yield failures.configure_failures(tmp_path / 'dumps')
+    failures.configure_failures()
+
+
+def find_h1(soup):
+    return utils.find_tag(soup, 'h1')
+
+
+def test_failure_message_is_bounded(failure_log, caplog):
+    with caplog.at_level(logging.ERROR):
+        with pytest.raises(BaseException) as excinfo:
+            utils.extract_page('https://peps.python.org/pep-0008/', PAGE,
+                               find_h1)
+    assert excinfo.typename == 'ParserFindTagException', (
+        'При отсутствии тега должно выбрасываться `ParserFindTagException`'
+    )
+    message = str(excinfo.value)
+    assert 'Не найден тег h1 None' in message, (
+        'Сообщение исключения должно содержать искомый тег'
+    )
+    assert 'https://peps.python.org/pep-0008/' in message, (
+        'Сообщение исключения должно содержать адрес страницы'
+    )
+    assert utils.content_hash(PAGE) in message, (
+        'Сообщение исключения должно содержать хеш страницы'
+    )
+    assert len(caplog.text) < len(PAGE), (
+        'В лог должен попадать только фрагмент страницы'
+    )
+    dump_path = failure_log.dump_dir / f'{utils.content_hash(PAGE)}.html'
+    assert dump_path.read_bytes() == PAGE, (
+        'Страница должна сохраняться в директорию дампов целиком'
+    )
+
+
+def test_failures_are_aggregated(failure_log, caplog):
+    urls = [f'https://peps.python.org/pep-{number:04}/' for number in range(3)]
+    with caplog.at_level(logging.ERROR):
+        for url in urls:
+            with pytest.raises(BaseException):
+                utils.extract_page(url, PAGE, find_h1)
+    assert len(caplog.records) == 1, (
+        'Повторная ошибка с той же сигнатурой не должна логироваться'
+    )
+    caplog.clear()
+    with caplog.at_level(logging.ERROR):
+        failures.log_failure_summary()
+    assert len(caplog.records) == 1, (
+        'Повторы ошибки должны выводиться одной записью'
+    )
+    assert 'Повторов: 3' in caplog.text and urls[2] in caplog.text, (
+        'Сводка должна содержать количество повторов и адреса страниц'
+    )
+
+
+def test_repeated_exceptions_are_counted(failure_log, caplog):
+    urls = [f'https://peps.python.org/pep-{number:04}/' for number in range(3)]
+    with caplog.at_level(logging.ERROR):
+        for url in urls:
+            try:
+                raise exceptions.ParserFindTagException(url)
+            except exceptions.ParserFindTagException:
+                failures.log_exception('Ошибка распарсивания', url)
+    assert len(caplog.records) == 1, (
+        'Повторное исключение с той же сигнатурой не должно логироваться'
+    )
+    assert caplog.records[0].exc_info is not None, (
+        'Первое исключение должно логироваться с трейсбеком'
+    )
+    caplog.clear()
+    with caplog.at_level(logging.ERROR):
+        failures.log_failure_summary()
+    assert 'Повторов: 3' in caplog.text and urls[2] in caplog.text, (
+        'Повторы исключения должны выводиться в сводке'
+    )
+
+
+def test_other_exceptions_are_logged_each_time(failure_log, caplog):
+    urls = [f'https://peps.python.org/pep-{number:04}/' for number in range(3)]
+    with caplog.at_level(logging.ERROR):
+        for url in urls:
+            try:
+                raise ValueError(f'Сбой загрузки: {url}')
+            except ValueError:
+                failures.log_exception('Ошибка распарсивания', url)
+    assert len(caplog.records) == 3, (
+        'Исключения, не связанные с поиском элементов, должны логироваться '
+        'для каждой страницы'
+    )
+
+
+def test_pep_status_key_logged_per_pep(failure_log, caplog):
+    rows = BeautifulSoup(''.join(
+        PEP_INDEX_ROW.format(number=number, key='X', status='Unknown')
+        for number in (1, 8)
+    ), 'html.parser').select('tr')
+    with caplog.at_level(logging.ERROR):
+        main.get_peps_for_update(rows, {}, {})
+    for number in (1, 8):
+        assert f'pep-{number:04d}/' in caplog.text, (
+            'Невалидный ключ статуса должен логироваться для каждого PEP '
+            'с адресом его страницы'
+        )
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent / 'src'
+
+IMPORT_TIME_BUDGET_MS = 400
+
+LAZY_MODULES = (
+    'aiohttp', 'bs4', 'lxml', 'prettytable', 'pyarrow', 'redis',
+    'requests_cache', 'tqdm',
+)
+
+
+def import_times(module):
+    """Возвращает время импорта модулей в мкс по выводу -X importtime."""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_main_lazy_imports():
+    times = import_times('main')
+    loaded = sorted(
+        name for name in times if name.split('.')[0] in LAZY_MODULES
+    )
+    assert not loaded, (
+        f'Модуль `main.py` не должен импортировать при загрузке: {loaded}'
+    )
+
+
+def test_main_import_time_budget():
+    import_time = min(import_times('main')['main'] for _ in range(3)) / 1000
+    assert import_time < IMPORT_TIME_BUDGET_MS, (
+        f'Импорт модуля `main.py` занял {import_time:.0f} мс, '
+        f'бюджет {IMPORT_TIME_BUDGET_MS} мс'
+    )
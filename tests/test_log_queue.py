@@ -0,0 +1,96 @@
+import json
+import logging
+from queue import Queue
+
+try:
+    from src import main  # noqa: F401
+    import log_queue
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `log_queue.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `log_queue.py`'
+
+
+class ListHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def make_record(msg, *args, exc_info=None):
+    return logging.LogRecord(
+        'test', logging.ERROR, __file__, 1, msg, args, exc_info
+    )
+
+
+def test_drop_policy():
+    handler = log_queue.BoundedQueueHandler(Queue(2), 'drop')
+    for number in range(5):
+        handler.handle(make_record('Запись %s', number))
+    assert handler.queue.qsize() == 2, (
+        'Очередь лога не должна превышать заданный размер'
+    )
+    assert handler.dropped == 3, (
+        'При политике drop не поместившиеся записи должны учитываться'
+    )
+    assert handler.queue.get().msg == 'Запись 0', (
+        'Сообщение записи должно подставляться до постановки в очередь'
+    )
+
+
+def test_pipeline_json_format():
+    list_handler = ListHandler()
+    pipeline = log_queue.LogPipeline((list_handler,), 1, 'drop', 'json')
+    for number in range(3):
+        pipeline.handler.handle(make_record(f'Запись {number}'))
+    pipeline.start()
+    pipeline.stop()
+    entries = [json.loads(line) for line in list_handler.lines]
+    assert entries[0]['message'] == 'Запись 0', (
+        'Записи лога должны передаваться обработчикам из очереди'
+    )
+    assert entries[0]['level'] == 'ERROR', 'JSON запись должна содержать level'
+    assert entries[-1]['message'] == 'Пропущено записей лога: 2', (
+        'При остановке должно выводиться количество пропущенных записей'
+    )
+
+
+def test_json_formatter_exception():
+    try:
+        raise ValueError('ошибка')
+    except ValueError as exc:
+        record = make_record('Исключение', exc_info=(
+            type(exc), exc, exc.__traceback__
+        ))
+    entry = json.loads(log_queue.JsonFormatter().format(record))
+    assert 'ValueError: ошибка' in entry['exception'], (
+        'JSON запись должна содержать трейсбек исключения'
+    )
+
+
+def test_prepare_formats_exception():
+    handler = log_queue.BoundedQueueHandler(Queue(1), 'drop')
+    try:
+        raise ValueError('ошибка')
+    except ValueError as exc:
+        handler.handle(make_record('Исключение', exc_info=(
+            type(exc), exc, exc.__traceback__
+        )))
+    record = handler.queue.get()
+    assert record.exc_info is None, (
+        'Запись в очереди не должна хранить исключение с кадрами стека'
+    )
+    entry = json.loads(log_queue.JsonFormatter().format(record))
+    assert 'ValueError: ошибка' in entry['exception'], (
+        'JSON запись должна содержать трейсбек, отформатированный '
+        'до постановки в очередь'
+    )
+    text = logging.Formatter().format(record)
+    assert 'ValueError: ошибка' in text, (
+        'Текстовая запись должна содержать трейсбек, отформатированный '
+        'до постановки в очередь'
+    )
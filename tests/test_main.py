@@ -1,7 +1,13 @@
 import pytest
+import requests
+import requests_mock
+import time
+from argparse import Namespace
+from collections.abc import Iterator
 from pathlib import Path
+from conftest import MAIN_DOC_URL
 try:
-    from src import main
+    from src import main, utils
 except ModuleNotFoundError:
     assert False, 'Убедитесь что в директории `src` есть файл `main.py`'
 except ImportError:
@@ -33,9 +39,10 @@ def test_main_file():
 def test_whats_new(mock_session):
     got = main.whats_new(mock_session)
     header = ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
-    assert isinstance(got, list), (
-        'Функция `whats_new` должна возвращать объект типа `list`'
+    assert isinstance(got, Iterator), (
+        'Функция `whats_new` должна возвращать генератор строк результатов'
     )
+    got = list(got)
     assert len(got) > 0, (
         'Убедитесь что функция `whats_new` модуля `main.py` '
         'возвращает непустой список'
@@ -54,9 +61,11 @@ def test_whats_new(mock_session):
 @pytest.mark.skip()
 def test_latest_versions(mock_session):
     got = main.latest_versions(mock_session)
-    assert isinstance(got, list), (
-        'Функция `latest_versions` должна возвращать объект типа `list`'
+    assert isinstance(got, Iterator), (
+        'Функция `latest_versions` должна возвращать генератор строк '
+        'результатов'
     )
+    got = list(got)
     assert isinstance(got[0], tuple), (
         'Функция `latest_versions` должна вернуть список `result`, '
         'элементами которого должны быть объекты типа `tuple`'
@@ -123,7 +132,10 @@ def test_mode_to_function():
             f'{name_func} - это строка.'
         )
         assert (
-            name_func in ['whats-new', 'latest-versions', 'download', 'pep']
+            name_func in [
+                'whats-new', 'latest-versions', 'download', 'pep',
+                'pep-index', 'query'
+            ]
         ), (
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет ключа `{name_func}`'
@@ -134,9 +146,303 @@ def test_mode_to_function():
         )
         assert (
             func.__name__ in [
-                'whats_new', 'latest_versions', 'download', 'pep'
+                'whats_new', 'latest_versions', 'download', 'pep',
+                'pep_index', 'query'
             ]
         ), (
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет значения {func}'
         )
+
+
+def test_pep(pep_site, tempfile_session):
+    got = list(main.pep(tempfile_session))
+    assert got == [
+        ('Статус', 'Количество'),
+        ('Accepted', 1),
+        ('Active', 1),
+        ('Draft', 1),
+        ('Final', 1),
+        ('Rejected', 2),
+        ('Withdrawn', 1),
+        ('Total', 7),
+    ], (
+        'Функция `pep` должна возвращать количество PEP в каждом статусе'
+    )
+
+
+@pytest.mark.parametrize('workers', [2, 8])
+def test_pep_workers(pep_site, tempfile_session, pep_namespace, workers):
+    expected = list(main.pep(tempfile_session))
+    pep_namespace.workers = workers
+    got = list(main.pep(tempfile_session, pep_namespace))
+    assert got == expected, (
+        'Результат функции `pep` не должен зависеть от количества потоков'
+    )
+
+
+@pytest.mark.parametrize('engine', ['sync', 'async', 'process'])
+def test_pep_engine(
+    monkeypatch, local_pep_site, tempfile_session, pep_namespace, engine
+):
+    monkeypatch.setattr(main, 'PEPS_URL', local_pep_site)
+    expected = list(main.pep(tempfile_session))
+    pep_namespace.workers = 4
+    pep_namespace.engine = engine
+    got = list(main.pep(tempfile_session, pep_namespace))
+    assert got == expected, (
+        f'Результат функции `pep` для движка {engine} '
+        'должен совпадать с последовательной загрузкой'
+    )
+
+
+def test_pep_incremental(monkeypatch, tmp_path, pep_site, pep_namespace):
+    monkeypatch.setattr(main, 'PEP_SNAPSHOT_FILE', tmp_path / 'pep.json')
+    pep_namespace.incremental = True
+    expected = list(main.pep(requests.Session(), pep_namespace))
+    pep_site.reset_mock()
+    got = list(main.pep(requests.Session(), pep_namespace))
+    assert got == expected, (
+        'Инкрементальный запуск должен брать статусы PEP из снимка'
+    )
+    assert pep_site.call_count == 1, (
+        'Инкрементальный запуск не должен загружать карточки PEP, '
+        'строки индекса которых не изменились'
+    )
+
+
+def test_pep_parser_lxml(pep_site, tempfile_session, pep_namespace):
+    expected = list(main.pep(tempfile_session))
+    pep_namespace.parser = 'lxml'
+    got = list(main.pep(tempfile_session, pep_namespace))
+    assert got == expected, (
+        'Результат функции `pep` для парсера lxml '
+        'должен совпадать с результатом BeautifulSoup'
+    )
+
+
+def test_get_version_info_lxml():
+    page = (
+        '<html><body><h1>What’s New In <em>Python</em> 3.11\n</h1>\n'
+        '<dl class="field-list">\n  <dt>Editor:</dt>\n'
+        '  <dd><p>Pablo Galindo\nSalgado</p>\n</dd>\n</dl></body></html>'
+    ).encode('utf-8')
+    got = main.get_version_info_lxml(utils.make_tree(page))
+    assert got == main.get_version_info(utils.make_soup(page)), (
+        'Функция `get_version_info_lxml` должна возвращать те же данные, '
+        'что и `get_version_info`'
+    )
+
+
+def test_download_formats(monkeypatch, tmp_path, pep_namespace):
+    monkeypatch.setattr(main, 'BASE_DIR', tmp_path)
+    archives = {
+        'python-docs-pdf-a4.zip': b'pdf-a4',
+        'python-docs-html.zip': b'html archive',
+        'python-docs.epub': b'epub',
+    }
+    links = ''.join(
+        f'<tr><td><a href="archives/{name}">Download</a></td></tr>'
+        for name in archives
+    )
+    (tmp_path / 'downloads').mkdir()
+    (tmp_path / 'downloads' / 'python-docs-html.zip').write_bytes(
+        b'html archive'
+    )
+    pep_namespace.formats = ['pdf-a4', 'html', 'epub']
+    pep_namespace.workers = 2
+    with requests_mock.Mocker() as mock:
+        mock.get(
+            MAIN_DOC_URL + 'download.html',
+            text=f'<table class="docutils">{links}</table>'
+        )
+        for name, content in archives.items():
+            mock.register_uri(
+                requests_mock.ANY,
+                f'{MAIN_DOC_URL}archives/{name}',
+                content=content,
+                headers={'Content-Length': str(len(content))}
+            )
+        main.download(requests.Session(), pep_namespace)
+        archive_gets = [
+            request.url for request in mock.request_history
+            if request.method == 'GET' and 'archives' in request.url
+        ]
+    for name, content in archives.items():
+        assert (tmp_path / 'downloads' / name).read_bytes() == content, (
+            f'Архив {name} должен быть загружен в директорию `downloads`'
+        )
+    assert sorted(archive_gets) == [
+        f'{MAIN_DOC_URL}archives/python-docs-pdf-a4.zip',
+        f'{MAIN_DOC_URL}archives/python-docs.epub',
+    ], 'Архивы того же размера, что и на сервере, не должны загружаться'
+
+
+def test_pep_memoize(monkeypatch, tmp_path, pep_site, pep_namespace):
+    monkeypatch.setattr(main, 'MEMO_DIR', tmp_path)
+    parsed_pages = []
+
+    def get_pep_status(pep_soup):
+        parsed_pages.append(pep_soup)
+        return main.get_pep_status(pep_soup)
+
+    monkeypatch.setitem(main.PARSER_TO_PEP_STATUS, 'bs4', get_pep_status)
+    pep_namespace.memoize = True
+    expected = list(main.pep(requests.Session(), pep_namespace))
+    parsed_pages.clear()
+    got = list(main.pep(requests.Session(), pep_namespace))
+    assert got == expected, (
+        'Данные из кеша разбора должны совпадать с разбором страниц'
+    )
+    assert not parsed_pages, (
+        'Неизменившиеся карточки PEP не должны разбираться повторно'
+    )
+
+
+def test_pep_memoize_parser(monkeypatch, tmp_path, pep_site, pep_namespace):
+    monkeypatch.setattr(main, 'MEMO_DIR', tmp_path)
+    monkeypatch.setattr(main, 'MEMOS', {})
+    parsed_pages = []
+
+    def get_pep_status_lxml(pep_tree):
+        parsed_pages.append(pep_tree)
+        return main.get_pep_status_lxml(pep_tree)
+
+    monkeypatch.setitem(
+        main.PARSER_TO_PEP_STATUS, 'lxml', get_pep_status_lxml
+    )
+    pep_namespace.memoize = True
+    expected = list(main.pep(requests.Session(), pep_namespace))
+    pep_namespace.parser = 'lxml'
+    got = list(main.pep(requests.Session(), pep_namespace))
+    assert got == expected and parsed_pages, (
+        'Данные из кеша разбора не должны использоваться другим парсером'
+    )
+
+
+def test_memo_prunes_unseen_pages(tmp_path):
+    memo_path = tmp_path / 'pep.json'
+    memo = main.ParsedPageMemo(memo_path)
+    scoped = memo.scoped('bs4', main.get_pep_status)
+    scoped.set('pep-0008/', 'hash', 'Active')
+    scoped.set('pep-0020/', 'hash', 'Active')
+    memo.save()
+    memo = main.ParsedPageMemo(memo_path)
+    scoped = memo.scoped('bs4', main.get_pep_status)
+    assert scoped.get('pep-0008/', 'hash') == 'Active'
+    memo.save()
+    memo = main.ParsedPageMemo(memo_path)
+    assert list(memo.pages) == ['bs4:get_pep_status pep-0008/'], (
+        'При сохранении кеша разбора должны удаляться страницы, '
+        'не запрошенные в текущем запуске'
+    )
+
+
+def test_watch(monkeypatch):
+    cycles = [[('a',)], RuntimeError('cycle'), [('a',)], [('b',)]]
+    outputs = []
+
+    def run_cycle(session, cli_args):
+        cycle = cycles.pop(0)
+        if isinstance(cycle, Exception):
+            raise cycle
+        return cycle
+
+    def sleep(interval):
+        if not cycles:
+            raise KeyboardInterrupt
+
+    monkeypatch.setitem(main.MODE_TO_FUNCTION, 'pep', run_cycle)
+    monkeypatch.setattr(main, 'sleep', sleep)
+    monkeypatch.setattr(
+        main, 'control_output', lambda results, _: outputs.append(results)
+    )
+    main.watch(requests.Session(), Namespace(mode='pep', watch=60))
+    assert outputs == [[('a',)], [('b',)]], (
+        'В режиме --watch результаты должны выводиться только при изменении, '
+        'а ошибка цикла не должна останавливать отслеживание'
+    )
+
+
+def test_split_modes():
+    got = main.split_modes(Namespace(mode=['pep', 'all'], watch=None))
+    assert [cli_args.mode for cli_args in got] == [
+        'pep', 'whats-new', 'latest-versions'
+    ], (
+        'Режим `all` должен заменяться режимами `ALL_MODES` без повторов'
+    )
+    assert all(cli_args.watch is None for cli_args in got), (
+        'Аргументы режимов должны сохранять остальные параметры'
+    )
+
+
+def test_run_modes(monkeypatch):
+    outputs = {}
+
+    def failing_mode(session, cli_args):
+        raise RuntimeError('mode')
+
+    monkeypatch.setitem(
+        main.MODE_TO_FUNCTION, 'pep', lambda session, cli_args: [('pep',)]
+    )
+    monkeypatch.setitem(main.MODE_TO_FUNCTION, 'whats-new', failing_mode)
+    monkeypatch.setitem(
+        main.MODE_TO_FUNCTION, 'latest-versions',
+        lambda session, cli_args: [(cli_args.mode,)]
+    )
+    monkeypatch.setattr(
+        main, 'control_output',
+        lambda results, cli_args: outputs.update({cli_args.mode: results})
+    )
+    with pytest.raises(BaseException) as excinfo:
+        main.run_modes(
+            requests.Session(),
+            *main.split_modes(Namespace(mode=['all'], watch=None))
+        )
+    assert excinfo.typename == 'ModeException', (
+        'При ошибке режима должно выбрасываться исключение `ModeException`'
+    )
+    assert outputs == {
+        'pep': [('pep',)], 'latest-versions': [('latest-versions',)]
+    }, (
+        'Каждый режим должен выводить свои результаты, '
+        'ошибка режима не должна останавливать остальные'
+    )
+
+
+def test_run_modes_console_output(monkeypatch, capsys):
+    def slow_mode(session, cli_args):
+        for row in range(3):
+            time.sleep(0.01)
+            yield (cli_args.mode, str(row))
+
+    for mode in main.ALL_MODES:
+        monkeypatch.setitem(main.MODE_TO_FUNCTION, mode, slow_mode)
+    main.run_modes(
+        requests.Session(),
+        *main.split_modes(Namespace(mode=['all'], watch=None, output=None))
+    )
+    assert capsys.readouterr().out.splitlines() == [
+        f'{mode} {row}' for mode in main.ALL_MODES for row in range(3)
+    ], (
+        'Вывод одновременно выполняемых режимов в консоль не должен '
+        'перемешиваться и должен идти в порядке режимов'
+    )
+
+
+@pytest.mark.parametrize('parser', ['bs4', 'lxml'])
+def test_pep_index(pep_site, parser):
+    cli_args = Namespace(
+        mode='pep-index', parser=parser, where=[('status', 'Rejected')]
+    )
+    got = list(main.pep_index(requests.Session(), cli_args))
+    assert got == [
+        main.TABLE_HEADER_PEP_INDEX,
+        ('42', 'PEP 42', 'Rejected', 'Standards Track', 'Guido',
+         '', '', '', '', ''),
+        ('100', 'PEP 100', 'Rejected', 'Standards Track', 'Guido',
+         '', '', '', '', ''),
+    ], (
+        'Режим `pep-index` должен возвращать метаданные PEP, '
+        'отобранные по условиям `--where`'
+    )
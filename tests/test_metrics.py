@@ -0,0 +1,116 @@
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+
+import pytest
+import requests
+
+try:
+    from src import main
+    import metrics
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+
+
+def test_registry_render():
+    registry = metrics.MetricsRegistry(buckets=(0.1, 1))
+    registry.increment('errors_total', exception='PEPStatusKeyException')
+    registry.increment('errors_total', exception='PEPStatusKeyException')
+    registry.observe('request_duration_seconds', 0.5, source='network')
+    registry.increment('cache_hits_total')
+    registry.increment('cache_misses_total', 3)
+    got = registry.render()
+    for line in (
+        '# TYPE pep_parser_errors_total counter',
+        'pep_parser_errors_total{exception="PEPStatusKeyException"} 2',
+        'pep_parser_request_duration_seconds_bucket'
+        '{source="network",le="0.1"} 0',
+        'pep_parser_request_duration_seconds_bucket'
+        '{source="network",le="1"} 1',
+        'pep_parser_request_duration_seconds_bucket'
+        '{source="network",le="+Inf"} 1',
+        'pep_parser_request_duration_seconds_count{source="network"} 1',
+        'pep_parser_cache_hit_ratio 0.25',
+    ):
+        assert line in got.splitlines(), (
+            f'В выводе метрик должна быть строка `{line}`'
+        )
+
+
+def test_pep_metrics_file(pep_site, pep_namespace, tmp_path):
+    metrics_file = tmp_path / 'parser.prom'
+    pep_namespace.metrics_file = metrics_file
+    with metrics.collect_metrics(pep_namespace):
+        with metrics.track_run(pep_namespace):
+            list(main.pep(requests.Session(), pep_namespace))
+    got = metrics_file.read_text(encoding='utf-8').splitlines()
+    assert 'pep_parser_pages_parsed_total{parser="bs4"} 7' in got, (
+        'В метриках должно учитываться количество разобранных страниц'
+    )
+    assert 'pep_parser_status_mismatches_total 1' in got, (
+        'В метриках должно учитываться количество несовпадающих статусов'
+    )
+    assert 'pep_parser_last_run_success{mode="pep"} 1' in got, (
+        'В метриках должна учитываться успешность запуска'
+    )
+    assert metrics.registry is None, (
+        'После запуска сбор метрик должен выключаться'
+    )
+
+
+def test_errors_counted_once(tmp_path):
+    metrics_file = tmp_path / 'parser.prom'
+    cli_args = Namespace(mode='pep', metrics_file=metrics_file)
+    with pytest.raises(KeyError):
+        with metrics.collect_metrics(cli_args), metrics.track_run(cli_args):
+            try:
+                raise KeyError('status')
+            except KeyError:
+                metrics.logging.exception('Ошибка')
+                raise
+    got = metrics_file.read_text(encoding='utf-8').splitlines()
+    assert 'pep_parser_errors_total{exception="KeyError"} 1' in got, (
+        'Залогированное и проброшенное исключение должно учитываться один раз'
+    )
+    assert 'pep_parser_last_run_success{mode="pep"} 0' in got, (
+        'Запуск с исключением должен учитываться как неуспешный'
+    )
+
+
+def test_metrics_endpoint():
+    metrics.registry = metrics.MetricsRegistry()
+    server = metrics.start_metrics_server(0)
+    try:
+        metrics.increment('pages_parsed_total', parser='lxml')
+        with urlopen(
+            f'http://127.0.0.1:{server.server_port}/metrics'
+        ) as response:
+            got = response.read().decode('utf-8')
+    finally:
+        server.shutdown()
+        server.server_close()
+        metrics.registry = None
+    assert 'pep_parser_pages_parsed_total{parser="lxml"} 1' in got, (
+        'Метрики должны отдаваться по адресу /metrics'
+    )
+
+
+def test_write_metrics_concurrently(tmp_path):
+    metrics_file = tmp_path / 'parser.prom'
+    metrics.registry = metrics.MetricsRegistry()
+    try:
+        metrics.increment('pages_parsed_total', parser='lxml')
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [
+                executor.submit(metrics.write_metrics, metrics_file)
+                for _ in range(200)
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        metrics.registry = None
+    assert 'pep_parser_pages_parsed_total{parser="lxml"} 1' in (
+        metrics_file.read_text(encoding='utf-8')
+    ), 'Режимы, запущенные параллельно, должны сохранять метрики по очереди'
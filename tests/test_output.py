@@ -1,8 +1,14 @@
+import json
 from datetime import datetime
 from typing import Optional
 from pathlib import Path
 import pytest
 from argparse import Namespace
+try:
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
 try:
     from src import outputs
 except ModuleNotFoundError:
@@ -31,6 +37,23 @@ def test_control_output_default(capsys, records, cli_arg):
     assert records in captured_out, f'Проверьте вывод в консоль для {cli_arg}'
 
 
+def test_default_output_streams_rows(capsys):
+    printed = []
+
+    def results():
+        yield 'Статус', 'Количество'
+        printed.append(capsys.readouterr().out)
+        yield 'Active', '1'
+
+    outputs.default_output(results())
+    assert printed == ['Статус Количество\n'], (
+        'Вывод в консоль должен печатать строку до получения следующей'
+    )
+    assert capsys.readouterr().out == 'Active 1\n', (
+        'Проверьте вывод в консоль построчно'
+    )
+
+
 @pytest.mark.parametrize('cli_arg, part_output', [
     (cli_args('whats-new', 'pretty'), 'New'),
     (cli_args('latest-versions', 'pretty'), 'docs'),
@@ -80,6 +103,62 @@ def test_control_output_file(monkeypatch, tmp_path, records, cli_arg):
     )
 
 
+@pytest.mark.parametrize('mode', ['whats-new', 'latest-versions', 'pep'])
+def test_control_output_jsonl(monkeypatch, tmp_path, records, mode):
+    monkeypatch.setattr(outputs, 'BASE_DIR', tmp_path)
+    records = records(mode)
+    outputs.control_output(iter(records), cli_args(mode, 'jsonl'))
+    output_file, = (tmp_path / 'results').glob('*.jsonl')
+    with open(output_file, encoding='utf-8') as f:
+        got = [json.loads(line) for line in f]
+    assert got == [dict(zip(records[0], row)) for row in records[1:]], (
+        'Каждая строка результатов должна записываться в файл JSON Lines '
+        'объектом с ключами из заголовка'
+    )
+
+
+@pytest.mark.parametrize('output_format', ['file', 'jsonl'])
+def test_control_output_failed_mode(monkeypatch, tmp_path, output_format):
+    def failing_rows():
+        yield ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
+        yield ('https://docs.python.org/3/whatsnew/3.11.html', 'a', 'b')
+        raise RuntimeError('Сбой режима')
+
+    monkeypatch.setattr(outputs, 'BASE_DIR', tmp_path)
+    with pytest.raises(RuntimeError):
+        outputs.control_output(
+            failing_rows(), cli_args('whats-new', output_format)
+        )
+    assert not list((tmp_path / 'results').iterdir()), (
+        'Если режим завершился с ошибкой, недописанный файл результатов '
+        'должен удаляться'
+    )
+
+
+@pytest.mark.parametrize('output_format, read_table', [
+    ('arrow', lambda path: pyarrow.ipc.open_file(str(path)).read_all()),
+    ('parquet', lambda path: pyarrow.parquet.read_table(str(path))),
+])
+def test_control_output_arrow(
+    monkeypatch, tmp_path, records, output_format, read_table
+):
+    pytest.importorskip('pyarrow')
+    monkeypatch.setattr(outputs, 'BASE_DIR', tmp_path)
+    monkeypatch.setattr(outputs, 'OUTPUT_BATCH_SIZE', 2)
+    records = records('latest-versions')
+    outputs.control_output(
+        iter(records), cli_args('latest-versions', output_format)
+    )
+    output_file, = (tmp_path / 'results').glob(f'*.{output_format}')
+    table = read_table(output_file)
+    assert table.column_names == list(records[0]), (
+        'Названия колонок должны совпадать с заголовком результатов'
+    )
+    assert [tuple(row.values()) for row in table.to_pylist()] == (
+        records[1:]
+    ), f'Проверьте запись результатов в формате {output_format}'
+
+
 def test_output_file():
     assert hasattr(outputs, 'control_output'), (
         'Напишите функцию `control_output` в модуле `output.py`'
@@ -0,0 +1,58 @@
+import sqlite3
+from argparse import Namespace
+
+import requests
+
+from conftest import PEP_CARD, PEPS_URL
+try:
+    from src import main
+    import outputs
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `main.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `main.py`'
+
+
+def test_pep_db(monkeypatch, tmp_path, pep_site, pep_namespace):
+    db_file = tmp_path / 'pep.sqlite3'
+    monkeypatch.setattr(main, 'PEP_DB_FILE', db_file)
+    pep_namespace.db = True
+    expected = list(main.pep(requests.Session(), pep_namespace))
+    got = list(main.query(None, Namespace(report='status-count')))
+    assert got == expected, (
+        'Отчет status-count по базе должен совпадать с результатом режима pep'
+    )
+    got = list(main.query(None, Namespace(report='mismatches')))
+    assert got[1:] == [(100, f'{PEPS_URL}pep-0100/', 'F', 'Rejected')], (
+        'Отчет mismatches должен возвращать PEP с несовпадающими статусами'
+    )
+
+    with sqlite3.connect(db_file) as db:
+        db.execute("UPDATE peps SET changed_at = '2000-01-01T00:00:00+00:00'")
+    pep_site.get(
+        f'{PEPS_URL}pep-0001/',
+        text=PEP_CARD.format(number=1, status='Withdrawn')
+    )
+    list(main.pep(requests.Session(), pep_namespace))
+    got = list(main.query(
+        None, Namespace(report='changes', since='2001-01-01')
+    ))
+    assert [row[:3] for row in got[1:]] == [
+        (1, f'{PEPS_URL}pep-0001/', 'Withdrawn')
+    ], 'Отчет changes должен возвращать только изменившиеся PEP'
+
+
+def test_query_console_output(
+    monkeypatch, tmp_path, pep_site, pep_namespace, capsys
+):
+    db_file = tmp_path / 'pep.sqlite3'
+    monkeypatch.setattr(main, 'PEP_DB_FILE', db_file)
+    pep_namespace.db = True
+    list(main.pep(requests.Session(), pep_namespace))
+    capsys.readouterr()
+    for report in ('status-count', 'mismatches', 'changes'):
+        cli_args = Namespace(report=report, since='', output=None)
+        outputs.control_output(main.query(None, cli_args), cli_args)
+    assert f'100 {PEPS_URL}pep-0100/ F Rejected' in capsys.readouterr().out, (
+        'Отчеты режима query должны выводиться в консоль без параметра -o'
+    )
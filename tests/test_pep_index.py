@@ -0,0 +1,49 @@
+try:
+    from src import pep_index
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `pep_index.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `pep_index.py`'
+
+
+def test_card_fields():
+    got = pep_index.card_fields('PEP 8 – Style Guide', [
+        ('Author:', 'Guido van Rossum,  Barry Warsaw'),
+        ('Status:', 'Active'),
+        ('Python-Version:', '3.8, 3.9'),
+        ('Post-History:', '05-Jul-2001'),
+    ])
+    assert got == {
+        'title': 'PEP 8 – Style Guide',
+        'authors': ['Guido van Rossum', 'Barry Warsaw'],
+        'status': 'Active',
+        'python_version': ['3.8', '3.9'],
+    }, 'Проверьте разбор полей заголовка карточки PEP'
+
+
+def test_pep_index_find():
+    index = pep_index.PEPIndex([
+        pep_index.make_record('8', 'pep-0008/', {
+            'status': 'Active', 'type': 'Process', 'authors': ['Guido'],
+        }),
+        pep_index.make_record('20', 'pep-0020/', {
+            'status': 'Active', 'type': 'Informational', 'authors': ['Tim'],
+        }),
+        pep_index.make_record('572', 'pep-0572/', {
+            'status': 'Final', 'type': 'Standards Track',
+            'authors': ['Chris', 'Tim', 'Guido'], 'python_version': ['3.8'],
+        }),
+    ])
+    got = [record.number for record in index.find(('authors', 'Tim'))]
+    assert got == ['20', '572'], 'Проверьте отбор PEP по автору'
+    got = index.find(('authors', 'Guido'), ('status', 'Final'))
+    assert [record.number for record in got] == ['572'], (
+        'Все условия отбора PEP должны выполняться'
+    )
+    index.add(pep_index.make_record('20', 'pep-0020/', {
+        'status': 'Final', 'type': 'Informational', 'authors': ['Tim'],
+    }))
+    assert index.count_by('status') == {'Active': 1, 'Final': 2}, (
+        'При замене записи PEP вторичные индексы должны обновляться'
+    )
+    assert len(index) == 3, 'Неверное количество записей в индексе'
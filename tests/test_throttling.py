@@ -0,0 +1,112 @@
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from conftest import SiteHandler, SiteServer
+try:
+    from src import throttling
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `throttling.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `throttling.py`'
+
+
+class FlakyHandler(SiteHandler):
+    pages = {'pep-0008/': 'PEP 8'}
+    failures = []
+
+    def do_GET(self):
+        if self.failures:
+            status, retry_after = self.failures.pop(0)
+            self.send_response(status)
+            self.send_header('Retry-After', retry_after)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        super().do_GET()
+
+
+@pytest.fixture
+def flaky_site():
+    server = SiteServer(('127.0.0.1', 0), FlakyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/'
+    FlakyHandler.failures.clear()
+    server.shutdown()
+    server.server_close()
+
+
+def scheduling_session(**kwargs):
+    session = requests.Session()
+    adapter = throttling.SchedulingAdapter(**kwargs)
+    session.mount('http://', adapter)
+    return session, adapter
+
+
+def test_retry_after(flaky_site):
+    FlakyHandler.failures.extend([(503, '0'), (429, '0')])
+    session, adapter = scheduling_session(retries=2)
+    response = session.get(f'{flaky_site}pep-0008/')
+    assert response.status_code == 200 and response.text == 'PEP 8', (
+        'Ответы 429 и 503 должны повторяться'
+    )
+    assert adapter.retried == 2, 'Неверное количество повторов'
+    assert adapter.get_bucket(flaky_site).rate < adapter.rate, (
+        'После ответов 429 и 503 скорость запросов к хосту должна снижаться'
+    )
+
+
+def test_retries_exhausted(flaky_site):
+    FlakyHandler.failures.extend([(500, '0')] * 2)
+    session, adapter = scheduling_session(retries=1)
+    response = session.get(f'{flaky_site}pep-0008/')
+    assert response.status_code == 500, (
+        'После исчерпания повторов должен возвращаться последний ответ'
+    )
+    assert adapter.retried == 1, 'Неверное количество повторов'
+
+
+def test_retry_after_date():
+    response = requests.Response()
+    response.headers['Retry-After'] = formatdate(
+        time.time() + 30, usegmt=True
+    )
+    assert 28 <= throttling.retry_after_delay(response) <= 30, (
+        'Заголовок Retry-After может содержать дату'
+    )
+
+
+def test_token_bucket_rate():
+    bucket = throttling.TokenBucket(rate=20)
+    started = time.monotonic()
+    for _ in range(30):
+        bucket.acquire()
+    elapsed = time.monotonic() - started
+    assert 0.4 <= elapsed < 1, (
+        'Сверх начального запаса токенов запросы должны идти '
+        'с заданной частотой'
+    )
+
+
+def test_async_engine_retries(flaky_site):
+    from src import utils
+    FlakyHandler.failures.extend([(503, '0'), (429, '0')])
+    session, adapter = scheduling_session(retries=2)
+    url = f'{flaky_site}pep-0008/'
+    [(got_url, task)] = utils.extract_by_urls(
+        session, [url], lambda soup: soup.text, engine='async'
+    )
+    assert task.result()[1] == 'PEP 8', (
+        'Движок async должен повторять ответы 429 и 503'
+    )
+    assert adapter.retried == 2, (
+        'Движок async должен использовать повторы транспорта сессии'
+    )
+    assert adapter.get_bucket(url).rate < adapter.rate, (
+        'Движок async должен снижать скорость запросов к хосту '
+        'после ответов 429 и 503'
+    )
@@ -0,0 +1,90 @@
+import argparse
+import json
+import time
+
+import pytest
+import requests
+
+try:
+    from src import main
+    import outputs
+    import timings
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `timings.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `timings.py`'
+
+
+@pytest.fixture
+def profiler():
+    yield timings.enable_profiling()
+    timings.disable_profiling()
+
+
+def test_timed_disabled():
+    @timings.timed('phase')
+    def func(value):
+        return value
+
+    assert timings.profiler is None, (
+        'По умолчанию профилирование должно быть выключено'
+    )
+    assert func(1) == 1, (
+        'Декоратор `timed` должен возвращать результат функции'
+    )
+
+
+def test_profiler_report(profiler):
+    for elapsed in (0.001, 0.002, 0.003, 0.004):
+        profiler.add('parse', elapsed)
+    report = profiler.report()['phases']['parse']
+    assert report['calls'] == 4, 'Неверное количество вызовов фазы'
+    assert report['total'] == pytest.approx(10), 'Неверное время фазы'
+    assert report['p50'] == pytest.approx(2), 'Неверная медиана фазы'
+    assert report['max'] == pytest.approx(4), 'Неверный максимум фазы'
+
+
+def test_percentile_nearest_rank():
+    values = [1, 2, 3, 4, 5]
+    assert timings.percentile(values, 50) == 3, (
+        'Медиана должна считаться методом ближайшего ранга'
+    )
+    assert timings.percentile(values, 90) == 5, (
+        '90-й перцентиль должен считаться методом ближайшего ранга'
+    )
+    assert timings.percentile(values, 1) == 1, (
+        'Малый перцентиль должен возвращать первый элемент'
+    )
+
+
+def test_output_excludes_mode_time(profiler):
+    def slow_rows():
+        yield ('Header',)
+        time.sleep(0.05)
+        yield ('Row',)
+
+    outputs.control_output(slow_rows(), argparse.Namespace(output=None))
+    report = profiler.report()['phases']['output']
+    assert report['total'] < 50, (
+        'Фаза output не должна включать время работы режима'
+    )
+
+
+def test_pep_profile(pep_site, pep_namespace, profiler, tmp_path, capsys):
+    list(main.pep(requests.Session(), pep_namespace))
+    report = profiler.report()
+    for phase in ('network', 'parse', 'select'):
+        assert phase in report['phases'], (
+            f'В профиле режима pep должна быть фаза {phase}'
+        )
+    assert report['bytes_fetched'] > 0, (
+        'В профиле должен учитываться объем загруженных данных'
+    )
+    profile_file = tmp_path / 'profile.json'
+    timings.print_profile(profile_file)
+    assert 'network' in capsys.readouterr().out, (
+        'Профиль должен выводиться в консоль'
+    )
+    assert json.loads(profile_file.read_text(encoding='utf-8')) == report, (
+        'Профиль должен сохраняться в JSON файл'
+    )
@@ -0,0 +1,158 @@
+import shutil
+import socket
+import ssl
+import subprocess
+import threading
+from argparse import Namespace
+
+import pytest
+import requests
+from requests_cache import CachedSession
+
+from conftest import SiteHandler, SiteServer
+try:
+    from src import main  # noqa: F401
+    import configs
+    import transport
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `transport.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `transport.py`'
+
+
+class PEPHandler(SiteHandler):
+    pages = {'pep-0008/': 'PEP 8'}
+    failures = []
+
+    def do_GET(self):
+        if self.failures:
+            self.send_response(self.failures.pop(0))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        super().do_GET()
+
+
+@pytest.fixture
+def pep_server():
+    server = SiteServer(('127.0.0.1', 0), PEPHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/'
+    PEPHandler.failures.clear()
+    server.shutdown()
+    server.server_close()
+
+
+def serve_h2(context, client, body):
+    """Отвечает body на каждый запрос соединения HTTP/2."""
+    import h2.config
+    import h2.connection
+    import h2.events
+    connection = h2.connection.H2Connection(
+        h2.config.H2Configuration(client_side=False)
+    )
+    connection.initiate_connection()
+    with context.wrap_socket(client, server_side=True) as tls_socket:
+        tls_socket.sendall(connection.data_to_send())
+        while data := tls_socket.recv(65535):
+            for event in connection.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    connection.send_headers(event.stream_id, [
+                        (':status', '200'),
+                        ('content-type', 'text/html; charset=utf-8'),
+                        ('content-length', str(len(body))),
+                    ])
+                    connection.send_data(event.stream_id, body, True)
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+            tls_socket.sendall(connection.data_to_send())
+
+
+@pytest.fixture
+def h2_server(tmp_path):
+    pytest.importorskip('h2')
+    if shutil.which('openssl') is None:
+        pytest.skip('Для сертификата сервера HTTP/2 нужен openssl')
+    cert, key = tmp_path / 'cert.pem', tmp_path / 'key.pem'
+    subprocess.run([
+        'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+        '-keyout', key, '-out', cert, '-days', '1', '-subj', '/CN=127.0.0.1',
+        '-addext', 'subjectAltName=IP:127.0.0.1',
+    ], check=True, capture_output=True)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    context.set_alpn_protocols(['h2'])
+    listener = socket.create_server(('127.0.0.1', 0))
+
+    def accept():
+        while True:
+            try:
+                client, _ = listener.accept()
+            except OSError:
+                return
+            threading.Thread(
+                target=serve_h2, args=(context, client, 'PEP 8'.encode()),
+                daemon=True
+            ).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    yield f'https://127.0.0.1:{listener.getsockname()[1]}/', cert
+    listener.close()
+
+
+def test_configure_adapter_pool():
+    adapter = configs.configure_adapter(Namespace(workers=32, keepalive=30))
+    pool_kw = adapter.poolmanager.connection_pool_kw
+    assert pool_kw['maxsize'] == 32 and pool_kw['block'], (
+        'Пул соединений к хосту должен быть не меньше количества загрузок'
+    )
+    assert (
+        socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1
+    ) in pool_kw['socket_options'], (
+        'С параметром --keepalive соединения пула должны включать '
+        'TCP keep-alive'
+    )
+
+
+def test_http2_adapter_retries_and_cache(pep_server):
+    pytest.importorskip('httpx')
+    pytest.importorskip('h2')
+    PEPHandler.failures.append(503)
+    adapter = configs.configure_adapter(Namespace(http2=True, retries=1))
+    assert isinstance(adapter, transport.HTTP2Adapter), (
+        'С параметром --http2 должен использоваться `HTTP2Adapter`'
+    )
+    session = CachedSession(backend='memory')
+    session.mount('http://', adapter)
+    responses = [session.get(f'{pep_server}pep-0008/') for _ in range(2)]
+    assert [response.text for response in responses] == ['PEP 8'] * 2, (
+        'Транспорт `HTTP2Adapter` должен возвращать содержимое страницы'
+    )
+    assert adapter.retried == 1, (
+        'Повторы запросов должны работать через `HTTP2Adapter`'
+    )
+    assert responses[1].from_cache, (
+        'Ответы `HTTP2Adapter` должны сохраняться в кеш'
+    )
+    session.close()
+
+
+def test_http2_adapter_negotiates_h2(h2_server, monkeypatch):
+    pytest.importorskip('httpx')
+    url, cert = h2_server
+    monkeypatch.setenv('SSL_CERT_FILE', str(cert))
+    adapter = configs.configure_adapter(
+        Namespace(http2=True, keepalive=30)
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    response = session.get(f'{url}pep-0008/')
+    assert response.raw.version == 20, (
+        'С параметром --http2 страницы должны загружаться по HTTP/2'
+    )
+    assert response.text == 'PEP 8', (
+        'Транспорт `HTTP2Adapter` должен возвращать содержимое страницы '
+        'по HTTP/2'
+    )
+    session.close()
@@ -54,3 +54,129 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+def test_make_soup():
+    got = utils.make_soup(
+        '<div>\n  <p>Python\n 3</p>\n  <p>&lt;PEP&gt;</p> <!-- x -->\n</div>'
+        .encode('utf-8')
+    )
+    assert '<div><p>Python 3</p><p>&lt;PEP&gt;</p><!-- x --></div>' in str(
+        got
+    ), (
+        'Функция `make_soup` модуля `utils.py` должна удалять переводы строк '
+        'и пробельные узлы между тегами'
+    )
+
+
+def test_make_soup_unicode_whitespace():
+    got = utils.make_soup(
+        '<table><tr>\xa0<td>PEP\xa08</td> \u2003</tr></table>'
+        .encode('utf-8')
+    )
+    assert '<tr><td>PEP\xa08</td></tr>' in str(got), (
+        'Функция `make_soup` должна отбрасывать узлы из неразрывных '
+        'и других пробелов Unicode между тегами'
+    )
+
+
+def test_xpath_one_tag_exception():
+    tree = utils.make_tree(b'<html><body><p>PEP</p></body></html>')
+    assert utils.xpath_one_tag(tree, '//p').text == 'PEP'
+    with pytest.raises(BaseException) as excinfo:
+        utils.xpath_one_tag(tree, '//h1')
+    assert excinfo.typename == 'ParserFindTagException', (
+        'Функция `xpath_one_tag` в модуле `utils.py` в случае '
+        'отсутствия искомого тэга должна выбросить исключение '
+        '`ParserFindTagException`, как и `find_tag`'
+    )
+
+
+def test_download_file_resume(tmp_path):
+    url = MAIN_DOC_URL + 'archives/python-docs-pdf-a4.zip'
+    content = bytes(range(256)) * 1000
+    file_path = tmp_path / 'python-docs-pdf-a4.zip'
+    part_path = tmp_path / 'python-docs-pdf-a4.zip.part'
+    part_path.write_bytes(content[:1000])
+
+    def archive(request, context):
+        offset = int(request.headers['Range'][len('bytes='):-1])
+        context.status_code = 206
+        context.headers['Content-Length'] = str(len(content) - offset)
+        return content[offset:]
+
+    with requests_mock.Mocker() as mock:
+        mock.get(url, content=archive)
+        utils.download_file(requests.Session(), url, file_path, 4096)
+    assert mock.last_request.headers['Range'] == 'bytes=1000-', (
+        'Функция `download_file` должна докачивать файл запросом `Range`'
+    )
+    assert mock.last_request.headers['Accept-Encoding'] == 'identity', (
+        'Функция `download_file` должна запрашивать файл без сжатия'
+    )
+    assert file_path.read_bytes() == content and not part_path.exists(), (
+        'Функция `download_file` должна сохранять файл целиком '
+        'и удалять файл `.part`'
+    )
+
+
+def test_download_files_bypass_cache(tmp_path):
+    from requests_cache import CachedSession
+    url = MAIN_DOC_URL + 'archives/python-docs-pdf-a4.zip'
+    file_path = tmp_path / 'python-docs-pdf-a4.zip'
+    session = CachedSession(backend='memory')
+    with requests_mock.Mocker() as mock:
+        mock.head(url, headers={'Content-Length': '3'})
+        mock.get(url, content=b'zip', headers={'Content-Length': '3'})
+        for _ in range(2):
+            utils.download_files(session, {url: file_path})
+    assert file_path.read_bytes() == b'zip', (
+        'Функция `download_files` должна сохранять файл'
+    )
+    assert [request.method for request in mock.request_history] == [
+        'GET', 'HEAD'
+    ], (
+        'Повторная загрузка должна проверять размер файла запросом `HEAD`'
+    )
+    assert not list(session.cache.responses), (
+        'Загрузка файлов не должна сохранять ответы в кеш сессии'
+    )
+    session.close()
+
+
+def test_in_order():
+    consumed = []
+
+    def results():
+        for key, result in [('b', 2), ('a', 1), ('d', 4), ('c', None)]:
+            consumed.append(key)
+            yield key, result
+
+    got = utils.in_order('abcd', results())
+    assert next(got) == 1 and consumed == ['b', 'a'], (
+        'Функция `in_order` должна отдавать результат, как только готовы '
+        'все предыдущие'
+    )
+    assert list(got) == [2, 4], (
+        'Функция `in_order` должна сохранять порядок ключей '
+        'и пропускать результаты None'
+    )
+
+
+def h1_text(soup):
+    return utils.select_one_tag(soup, 'h1').text
+
+
+def test_extract_batch():
+    got = utils.extract_batch([
+        ('pep-0008/', 'hash', b'<html><body><h1>PEP 8</h1></body></html>'),
+        ('pep-0020/', 'hash', b'<html><body></body></html>'),
+    ], h1_text, 'bs4')
+    assert got[0] == ('pep-0008/', 'PEP 8', None), (
+        'Функция `extract_batch` должна возвращать данные страницы'
+    )
+    url, data, exc = got[1]
+    assert isinstance(exc, utils.DOMQueryingException), (
+        'Функция `extract_batch` должна возвращать исключение разбора '
+        'страницы вместо того, чтобы прерывать пачку'
+    )